@@ -2,13 +2,14 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import ValidationError
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
 from models import User
-from database import get_user_by_email
+from database import get_user_by_email, CURRENT_TENANT, DEFAULT_TENANT
+from ids import new_id
+from sessions import is_access_token_revoked, revoke_access_token
 
 # Constants for JWT token
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # In production, use a secure key and environment variable
@@ -17,7 +18,6 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # OAuth2 setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -27,7 +27,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
         
-    to_encode.update({"exp": expire})
+    # jti identifies the token so it can be revoked before it expires
+    to_encode.update({"exp": expire, "jti": new_id()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -45,9 +46,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    
+    if is_access_token_revoked(payload.get("jti")):
+        raise credentials_exception
         
     user = get_user_by_email(email)
     if user is None:
         raise credentials_exception
+    
+    # Scope all data access in this request to the user's school
+    CURRENT_TENANT.set(payload.get("tenant", DEFAULT_TENANT))
         
     return user
+
+def revoke_token(token: str) -> None:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return
+    if payload.get("jti"):
+        revoke_access_token(payload["jti"], payload["exp"])
@@ -0,0 +1,80 @@
+"""Measure read throughput of GET /api/students for 1..N uvicorn workers.
+
+Usage: python bench_read_scaling.py [--workers 1 2 4] [--clients 8] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from multiprocessing import Pool
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _login(base_url: str) -> str:
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login",
+        data=json.dumps({"email": "admin@focus.edu", "password": "adminpass"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["access_token"]
+
+def _wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/docs")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+def _client(args) -> int:
+    base_url, token, seconds = args
+    request = urllib.request.Request(
+        f"{base_url}/api/students", headers={"Authorization": f"Bearer {token}"}
+    )
+    count = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        count += 1
+    return count
+
+def run(workers: int, clients: int, seconds: float, port: int) -> float:
+    env = dict(os.environ, FOCUS_STATE_DIR=tempfile.mkdtemp(prefix="focus-bench-"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=HERE, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        _wait_until_ready(base_url)
+        token = _login(base_url)
+        with Pool(clients) as pool:
+            counts = pool.map(_client, [(base_url, token, seconds)] * clients)
+        return sum(counts) / seconds
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    for workers in args.workers:
+        rate = run(workers, args.clients, args.seconds, args.port)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
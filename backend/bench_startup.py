@@ -0,0 +1,57 @@
+"""Measure backend startup: module import time and process start to first response.
+
+Usage: python bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+def measure_import() -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=HERE)
+    return float(output.strip())
+
+def measure_first_response(port: int) -> float:
+    # Time from spawning the server to the first successful login
+    login = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/auth/login",
+        data=json.dumps({"email": "admin@focus.edu", "password": "adminpass"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=HERE,
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(login) as response:
+                    response.read()
+                return time.perf_counter() - start
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("Server exited during startup")
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first_responses = [measure_first_response(args.port) for _ in range(args.runs)]
+    print(f"import main:          median {statistics.median(imports) * 1000:7.1f} ms")
+    print(f"start to first login: median {statistics.median(first_responses) * 1000:7.1f} ms")
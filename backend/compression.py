@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Response compression negotiated through Accept-Encoding.
+#
+# Compressed bodies are cached by (encoding, hash of the uncompressed body),
+# so a list that has not changed since the last request is served from the
+# cache instead of being compressed again. Hashing is much cheaper than
+# compressing, and keying on content keeps per-user and per-tenant responses
+# correct without tracking collection versions.
+#
+# Only complete responses with a Content-Length are compressed; streaming
+# responses (exports, file downloads) pass through untouched. Large bodies are
+# compressed on a worker thread so a cache miss does not stall the event loop.
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6)
+
+COMPRESSORS = {"gzip": _gzip}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+
+# Preferred first when the client accepts several
+PREFERENCE = ("br", "zstd", "gzip")
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        try:
+            if params.startswith("q=") and float(params[2:] or 0) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in PREFERENCE:
+        if encoding in COMPRESSORS and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+class CompressedBodyCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    def key(self, encoding: str, body: bytes) -> Tuple[str, bytes]:
+        return (encoding, hashlib.blake2b(body, digest_size=16).digest())
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+        return compressed
+
+    def put(self, key: Tuple[str, bytes], compressed: bytes) -> None:
+        if key in self._entries:
+            # Another request compressed the same body meanwhile
+            return
+        self._entries[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+class CompressionMiddleware:
+    def __init__(
+        self, app, minimum_size: int = 1024, cache_bytes: int = 32 * 1024 * 1024, thread_size: int = 64 * 1024
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Smaller bodies compress faster than a thread hop costs
+        self.thread_size = thread_size
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message: Optional[Dict] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                response_headers = dict(message["headers"])
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in response_headers
+                    or b"content-length" not in response_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    return await send(message)
+                # Hold the headers until we know whether the body gets compressed
+                start_message = message
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                return await send(message)
+
+            key = self.cache.key(encoding, body)
+            compressed = self.cache.get(key)
+            if compressed is None:
+                if len(body) >= self.thread_size:
+                    compressed = await anyio.to_thread.run_sync(COMPRESSORS[encoding], body)
+                else:
+                    compressed = COMPRESSORS[encoding](body)
+                self.cache.put(key, compressed)
+            vary = b"Accept-Encoding"
+            response_headers: List[Tuple[bytes, bytes]] = []
+            for name, value in start_message["headers"]:
+                if name == b"vary":
+                    vary = value + b", Accept-Encoding"
+                elif name != b"content-length":
+                    response_headers.append((name, value))
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,20 +1,39 @@
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple, Union
+from collections import OrderedDict
+from contextvars import ContextVar
+import json
+import os
 import random
-import uuid
+import threading
 from datetime import datetime
 from models import (
     User, UserCreate, UserRole, 
-    Student, StudentCreate,
+    Student, StudentCreate, StudentUpdate, StudentBulkSelector,
     Teacher, TeacherCreate, TeacherUpdate,
     Class, ClassCreate, ClassUpdate,
     ActivityItem, DashboardStats
 )
-from passlib.context import CryptContext
+from rollups import Rollups
+from indexes import StudentIndexes
+from ids import new_id
+from locks import ReadWriteLock
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
-# Mock database (in-memory data)
+# Password hashing: one shared context, created on first use since passlib
+# and the bcrypt backend are only needed once someone logs in
+_pwd_context = None
+
+def get_pwd_context() -> "CryptContext":
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+# Mock database (in-memory data). Seed ids are short fixed strings rather than
+# ids.new_id() values, so they don't sort by creation time.
 USERS = [
     User(
         id="1", 
@@ -46,12 +65,22 @@ USERS = [
     ),
 ]
 
-# Store passwords separately for security
+# Store passwords separately for security. The seed accounts use precomputed
+# bcrypt hashes (of adminpass, johnpass, emmapass and robertpass) so importing
+# this module does not spend time hashing.
 USER_PASSWORDS = {
-    "admin@focus.edu": pwd_context.hash("adminpass"),
-    "john@focus.edu": pwd_context.hash("johnpass"),
-    "emma@focus.edu": pwd_context.hash("emmapass"),
-    "robert@focus.edu": pwd_context.hash("robertpass"),
+    "admin@focus.edu": "$2b$12$aqaFz/ZScdlg1.ZFw5bKV.SwVTplxz8Uv7.5gOgdnYTb9s3NejhNK",
+    "john@focus.edu": "$2b$12$fnkZVQPcM2Pn9MqrDUgDkusPIENECn7trjR0pbq0BnPpkXBNtVYQm",
+    "emma@focus.edu": "$2b$12$F38/EWjlZXxH9dcP6YWQsOinBirOZ/AFpp7f.hCnEIu6/CaEwg60i",
+    "robert@focus.edu": "$2b$12$OFTJRdbsbkK81uv6b3kWXupvj2M/jreEoSiDhJy/7b9Kl0sdPNbY2",
+}
+
+# School (tenant) each account belongs to
+USER_TENANTS = {
+    "admin@focus.edu": "default",
+    "john@focus.edu": "default",
+    "emma@focus.edu": "default",
+    "robert@focus.edu": "default",
 }
 
 STUDENTS = [
@@ -304,6 +333,307 @@ TEACHERS = [
     ),
 ]
 
+# Tenants: every school gets its own partition of students, teachers, classes
+# and activities, together with its own change feed. Partitions are loaded on
+# first use and, when FOCUS_TENANT_DIR is set, written back there and unloaded
+# once more than MAX_LOADED_TENANTS are in memory.
+DEFAULT_TENANT = "default"
+MAX_LOADED_TENANTS = 50
+TENANT_DATA_DIR = os.environ.get("FOCUS_TENANT_DIR")
+# Disabled in multi-worker mode, where the shared snapshot holds every tenant
+ALLOW_TENANT_UNLOAD = True
+
+CURRENT_TENANT: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+# Change feed: every mutation of students, teachers and classes is appended
+# to the tenant's log with a sequence number so clients can sync only what changed
+CHANGE_LOG_RETENTION = 1000
+
+COLLECTION_MODELS = {
+    "students": Student,
+    "teachers": Teacher,
+    "classes": Class,
+    "activities": ActivityItem,
+}
+
+class TenantStore:
+    def __init__(self, tenant_id: str, state: Optional[Dict[str, Any]] = None):
+        self.tenant_id = tenant_id
+        self.students: List[Student] = []
+        self.teachers: List[Teacher] = []
+        self.classes: List[Class] = []
+        self.activities: List[ActivityItem] = []
+        self.change_log: List[Dict[str, Any]] = []
+        self.change_version = 0
+        self.rollups = Rollups()
+        self.indexes = StudentIndexes()
+        if state:
+            self.load(state)
+
+    def dump(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {"version": self.change_version}
+        for collection in COLLECTION_MODELS:
+            state[collection] = [record.model_dump() for record in getattr(self, collection)]
+        return state
+
+    def load(self, state: Dict[str, Any]) -> None:
+        for collection, model in COLLECTION_MODELS.items():
+            setattr(self, collection, [model(**data) for data in state[collection]])
+        self.change_version = state["version"]
+        # Older changes are not part of the state; clients behind it get a full sync
+        self.change_log.clear()
+        self.rebuild_derived()
+
+    def rebuild_derived(self) -> None:
+        # Rollups and indexes are otherwise kept current from the change feed
+        students = [student.model_dump() for student in self.students]
+        self.rollups = Rollups.build(students)
+        self.indexes = StudentIndexes.build(students)
+
+TENANTS: "OrderedDict[str, TenantStore]" = OrderedDict()
+
+# Guards every tenant store and STATE_EXTENSIONS: readers take DATA_LOCK.read(),
+# anything that mutates them DATA_LOCK.write(). Concurrent readers may still
+# load and evict tenants, so the TENANTS map itself has its own lock.
+DATA_LOCK = ReadWriteLock()
+_TENANTS_LOCK = threading.RLock()
+
+def _tenant_path(tenant_id: str) -> str:
+    return os.path.join(TENANT_DATA_DIR, f"{tenant_id}.json")
+
+def _load_tenant(tenant_id: str) -> TenantStore:
+    if TENANT_DATA_DIR and os.path.exists(_tenant_path(tenant_id)):
+        with open(_tenant_path(tenant_id)) as data:
+            return TenantStore(tenant_id, json.load(data))
+    store = TenantStore(tenant_id)
+    if tenant_id == DEFAULT_TENANT:
+        # The default school starts with the mock data above
+        store.students = STUDENTS.copy()
+        store.teachers = TEACHERS.copy()
+        store.classes = CLASSES.copy()
+        store.activities = ACTIVITIES.copy()
+        store.rebuild_derived()
+    return store
+
+def unload_tenant(tenant_id: str) -> bool:
+    # Callers hold DATA_LOCK, so no write to the tenant can be in progress
+    with _TENANTS_LOCK:
+        store = TENANTS.get(tenant_id)
+        if store is None or not TENANT_DATA_DIR or not ALLOW_TENANT_UNLOAD:
+            return False
+        os.makedirs(TENANT_DATA_DIR, exist_ok=True)
+        with open(_tenant_path(tenant_id) + ".tmp", "w") as out:
+            json.dump(store.dump(), out)
+        os.replace(_tenant_path(tenant_id) + ".tmp", _tenant_path(tenant_id))
+        del TENANTS[tenant_id]
+        return True
+
+def get_tenant(tenant_id: str) -> TenantStore:
+    with _TENANTS_LOCK:
+        store = TENANTS.get(tenant_id)
+        if store is not None:
+            TENANTS.move_to_end(tenant_id)
+            return store
+
+        store = TENANTS[tenant_id] = _load_tenant(tenant_id)
+        # Unload the least recently used tenants to bound memory
+        while len(TENANTS) > MAX_LOADED_TENANTS:
+            oldest = next(iter(TENANTS))
+            if oldest == tenant_id or not unload_tenant(oldest):
+                break
+        return store
+
+def _tenant() -> TenantStore:
+    return get_tenant(CURRENT_TENANT.get())
+
+# Called with every change (including activity inserts), e.g. to publish
+# writes to other worker processes
+CHANGE_LISTENERS: List[Callable[[Dict[str, Any]], None]] = []
+
+# State kept outside the tenant stores (e.g. auth sessions) that still travels
+# through the change feed and snapshots: name -> (apply_change, dump, load)
+STATE_EXTENSIONS: Dict[str, tuple] = {}
+
+def _append_change(store: TenantStore, change: Dict[str, Any]) -> None:
+    store.change_version = change["seq"]
+    store.change_log.append(change)
+    store.rollups.apply_change(change)
+    store.indexes.apply_change(change)
+    # Compact the log past the retention window
+    if len(store.change_log) > CHANGE_LOG_RETENTION:
+        del store.change_log[:len(store.change_log) - CHANGE_LOG_RETENTION]
+
+def _append_changes(store: TenantStore, changes: List[Dict[str, Any]]) -> None:
+    # Batched form of _append_change: indexes and rollups are updated once for
+    # the whole batch and the log is compacted once
+    store.change_version = changes[-1]["seq"]
+    store.change_log.extend(changes)
+    store.rollups.apply_changes(changes)
+    store.indexes.apply_changes(changes)
+    if len(store.change_log) > CHANGE_LOG_RETENTION:
+        del store.change_log[:len(store.change_log) - CHANGE_LOG_RETENTION]
+
+def _record_changes(collection: str, op: str, records: List[Tuple[str, Optional[Dict[str, Any]]]]) -> None:
+    # Records one change per (id, data) pair, for bulk operations
+    if not records:
+        return
+    store = _tenant()
+    changes = [
+        {
+            "seq": store.change_version + i,
+            "tenant": store.tenant_id,
+            "collection": collection,
+            "op": op,
+            "id": record_id,
+            "data": data,
+        }
+        for i, (record_id, data) in enumerate(records, start=1)
+    ]
+    _append_changes(store, changes)
+    for change in changes:
+        for listener in CHANGE_LISTENERS:
+            listener(change)
+
+def _record_change(collection: str, op: str, record_id: str, data: Optional[Dict[str, Any]] = None) -> None:
+    store = _tenant()
+    change = {
+        "seq": store.change_version + 1,
+        "tenant": store.tenant_id,
+        "collection": collection,
+        "op": op,
+        "id": record_id,
+        # Deletes are kept as tombstones without data
+        "data": data,
+    }
+    _append_change(store, change)
+    for listener in CHANGE_LISTENERS:
+        listener(change)
+
+def apply_change(change: Dict[str, Any]) -> None:
+    # Replays a change recorded by another process, without notifying listeners
+    collection = change["collection"]
+    if collection in STATE_EXTENSIONS:
+        STATE_EXTENSIONS[collection][0](change)
+        return
+
+    store = get_tenant(change.get("tenant", DEFAULT_TENANT))
+    model = COLLECTION_MODELS[collection]
+    if collection == "activities":
+        store.activities.insert(0, model(**change["data"]))
+        return
+
+    records = getattr(store, collection)
+    if change["op"] == "delete":
+        setattr(store, collection, [record for record in records if record.id != change["id"]])
+    else:
+        new_record = model(**change["data"])
+        for i, record in enumerate(records):
+            if record.id == new_record.id:
+                records[i] = new_record
+                break
+        else:
+            records.append(new_record)
+    _append_change(store, change)
+
+def dump_state() -> Dict[str, Any]:
+    with _TENANTS_LOCK:
+        tenants = list(TENANTS.items())
+    return {
+        "tenants": {tenant_id: store.dump() for tenant_id, store in tenants},
+        "extensions": {name: dump() for name, (_, dump, _) in STATE_EXTENSIONS.items()},
+    }
+
+def load_state(state: Dict[str, Any]) -> None:
+    with _TENANTS_LOCK:
+        TENANTS.clear()
+        for tenant_id, tenant_state in state["tenants"].items():
+            TENANTS[tenant_id] = TenantStore(tenant_id, tenant_state)
+    for name, (_, _, load) in STATE_EXTENSIONS.items():
+        load(state.get("extensions", {}).get(name))
+
+def get_changes_since(since: Optional[int] = None) -> Dict[str, Any]:
+    store = _tenant()
+    oldest_seq = store.change_log[0]["seq"] if store.change_log else store.change_version + 1
+    # First sync, or client is too far behind (or ahead, after a restart): send a full snapshot
+    if since is None or since > store.change_version or since < oldest_seq - 1:
+        return {
+            "version": store.change_version,
+            "full": True,
+            "changes": [],
+            "students": get_students(),
+            "teachers": get_teachers(),
+            "classes": get_classes(),
+        }
+
+    # Only the latest change per record matters to the client
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for change in store.change_log[since - oldest_seq + 1:]:
+        key = (change["collection"], change["id"])
+        latest.pop(key, None)
+        latest[key] = change
+    return {
+        "version": store.change_version,
+        "full": False,
+        "changes": list(latest.values()),
+    }
+
+def query_rollups(dimension: str, grade: Optional[str] = None) -> List[Dict[str, Any]]:
+    return _tenant().rollups.query(dimension, grade)
+
+def rebuild_rollups() -> List[str]:
+    # Recomputes the rollups from scratch; returns the groups where the
+    # incrementally maintained ones had drifted
+    store = _tenant()
+    rebuilt = Rollups.build(student.model_dump() for student in store.students)
+    mismatches = store.rollups.diff(rebuilt)
+    store.rollups = rebuilt
+    return mismatches
+
+def search_students(
+    conditions: List[tuple],
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Union[List[Student], List[Dict[str, Any]]]:
+    records = _tenant().indexes.search(conditions, order_by, descending, limit)
+    if fields:
+        return project(records, fields)
+    # Index records were validated when they were written
+    return [Student.model_construct(**record) for record in records]
+
+def project(records: Iterable[Any], fields: List[str]) -> List[Dict[str, Any]]:
+    # Reads only the requested attributes (or keys, for index records) instead
+    # of dumping whole models
+    return [
+        {field: record[field] for field in fields} if isinstance(record, dict)
+        else {field: getattr(record, field) for field in fields}
+        for record in records
+    ]
+
+def _log_activity(action: str, target: str) -> ActivityItem:
+    store = _tenant()
+    new_activity = ActivityItem(
+        id=new_id(),
+        userId="1",  # Admin user
+        userName="Admin User",
+        userAvatar="/placeholder.svg",
+        action=action,
+        target=target,
+        date=datetime.now().isoformat(),
+        type="system"
+    )
+    store.activities.insert(0, new_activity)
+    for listener in CHANGE_LISTENERS:
+        listener({
+            "tenant": store.tenant_id,
+            "collection": "activities",
+            "op": "insert",
+            "id": new_activity.id,
+            "data": new_activity.model_dump(),
+        })
+    return new_activity
+
 # Database access functions
 def get_users() -> List[User]:
     return USERS.copy()
@@ -314,8 +644,11 @@ def get_user_by_email(email: str) -> Optional[User]:
             return user
     return None
 
+def get_user_tenant(email: str) -> str:
+    return USER_TENANTS.get(email, DEFAULT_TENANT)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def authenticate_user(email: str, password: str) -> Optional[User]:
     user = get_user_by_email(email)
@@ -327,32 +660,67 @@ def authenticate_user(email: str, password: str) -> Optional[User]:
         return None
     return user
 
+def _student_matches(student: Student, query: str) -> bool:
+    return (
+        query in student.name.lower() or 
+        query in student.email.lower() or 
+        query in student.grade.lower()
+    )
+
 def get_students(query: Optional[str] = None) -> List[Student]:
+    store = _tenant()
     if not query:
-        return STUDENTS.copy()
+        return store.students.copy()
     
     query = query.lower()
-    return [
-        student for student in STUDENTS
-        if query in student.name.lower() or 
-           query in student.email.lower() or 
-           query in student.grade.lower()
-    ]
+    return [student for student in store.students if _student_matches(student, query)]
+
+def get_student_by_id(student_id: str) -> Optional[Student]:
+    store = _tenant()
+    return next((s for s in store.students if s.id == student_id), None)
+
+def iter_students(query: Optional[str] = None) -> Iterator[Student]:
+    # Lazily yields students so large exports don't materialize the whole list.
+    # The tenant and the list are captured now, not when the caller starts
+    # iterating; the shallow copy keeps writes between chunks from shifting it.
+    store = _tenant()
+    query = query.lower() if query else None
+    return (
+        student for student in store.students.copy()
+        if not query or _student_matches(student, query)
+    )
+
+def _class_matches(cls: Class, query: str) -> bool:
+    return (
+        query in cls.name.lower() or 
+        query in cls.subject.lower() or 
+        query in cls.teacherName.lower()
+    )
 
 def get_classes(query: Optional[str] = None) -> List[Class]:
+    store = _tenant()
     if not query:
-        return CLASSES.copy()
+        return store.classes.copy()
     
     query = query.lower()
-    return [
-        cls for cls in CLASSES
-        if query in cls.name.lower() or 
-           query in cls.subject.lower() or 
-           query in cls.teacherName.lower()
-    ]
+    return [cls for cls in store.classes if _class_matches(cls, query)]
+
+def get_class_by_id(class_id: str) -> Optional[Class]:
+    store = _tenant()
+    return next((c for c in store.classes if c.id == class_id), None)
+
+def iter_classes(query: Optional[str] = None) -> Iterator[Class]:
+    store = _tenant()
+    query = query.lower() if query else None
+    return (cls for cls in store.classes.copy() if not query or _class_matches(cls, query))
 
 def get_activities(limit: int = 5) -> List[ActivityItem]:
-    return ACTIVITIES[:limit]
+    store = _tenant()
+    return store.activities[:limit]
+
+def iter_activities() -> Iterator[ActivityItem]:
+    store = _tenant()
+    return iter(store.activities.copy())
 
 def get_dashboard_stats(role: UserRole) -> DashboardStats:
     # In a real application, these would be calculated from the database
@@ -365,134 +733,212 @@ def get_dashboard_stats(role: UserRole) -> DashboardStats:
         upcomingEvents=12
     )
 
+def _teacher_matches(teacher: Teacher, query: str) -> bool:
+    return bool(
+        query in teacher.name.lower() or 
+        query in teacher.email.lower() or 
+        query in teacher.subject.lower() or
+        (teacher.department and query in teacher.department.lower()) or
+        (teacher.qualification and query in teacher.qualification.lower())
+    )
+
 def get_teachers(query: Optional[str] = None) -> List[Teacher]:
+    store = _tenant()
     if not query:
-        return TEACHERS.copy()
+        return store.teachers.copy()
     
     query = query.lower()
-    return [
-        teacher for teacher in TEACHERS
-        if query in teacher.name.lower() or 
-           query in teacher.email.lower() or 
-           query in teacher.subject.lower() or
-           (teacher.department and query in teacher.department.lower()) or
-           (teacher.qualification and query in teacher.qualification.lower())
-    ]
+    return [teacher for teacher in store.teachers if _teacher_matches(teacher, query)]
+
+def get_teacher_by_id(teacher_id: str) -> Optional[Teacher]:
+    store = _tenant()
+    return next((t for t in store.teachers if t.id == teacher_id), None)
+
+def iter_teachers(query: Optional[str] = None) -> Iterator[Teacher]:
+    store = _tenant()
+    query = query.lower() if query else None
+    return (teacher for teacher in store.teachers.copy() if not query or _teacher_matches(teacher, query))
 
 def add_student(student_data: StudentCreate) -> Student:
-    student_id = str(uuid.uuid4())[:8]
+    store = _tenant()
+    student_id = new_id()
     new_student = Student(
         id=student_id,
         **student_data.model_dump()
     )
-    STUDENTS.append(new_student)
+    store.students.append(new_student)
+    _record_change("students", "insert", new_student.id, new_student.model_dump())
     return new_student
 
+def add_students_bulk(students_data: List[StudentCreate]) -> List[Student]:
+    store = _tenant()
+    # Single insert path for imports: one extend, one index/rollup update and
+    # one activity entry per batch. The rows were already validated as
+    # StudentCreate, so the records are built without validating again.
+    new_students = [
+        Student.model_construct(id=new_id(), **student_data.model_dump())
+        for student_data in students_data
+    ]
+    store.students.extend(new_students)
+    _record_changes("students", "insert", [(student.id, student.model_dump()) for student in new_students])
+    if new_students:
+        _log_activity("imported students", f"{len(new_students)} students")
+    return new_students
+
+def _student_selected(student: Student, selector: StudentBulkSelector, ids: Optional[set], query: Optional[str]) -> bool:
+    if ids is not None and student.id not in ids:
+        return False
+    if query and not _student_matches(student, query):
+        return False
+    if selector.grade is not None and student.grade != selector.grade:
+        return False
+    if selector.status is not None and student.status != selector.status:
+        return False
+    return True
+
+def _bulk_outcomes(selector: StudentBulkSelector, touched: List[str], status: str) -> List[Dict[str, str]]:
+    results = [{"id": student_id, "status": status} for student_id in touched]
+    if selector.ids is not None:
+        touched_ids = set(touched)
+        results.extend(
+            {"id": student_id, "status": "not_found"}
+            for student_id in dict.fromkeys(selector.ids) if student_id not in touched_ids
+        )
+    return results
+
+def update_students_bulk(selector: StudentBulkSelector, changes: StudentUpdate) -> List[Dict[str, str]]:
+    store = _tenant()
+    # One pass over the students and a single aggregated activity entry
+    ids = set(selector.ids) if selector.ids is not None else None
+    query = selector.query.lower() if selector.query else None
+    update_data = {k: v for k, v in changes.model_dump().items() if v is not None}
+
+    updated: List[str] = []
+    for i, student in enumerate(store.students):
+        if _student_selected(student, selector, ids, query):
+            updated_student = Student(**{**student.model_dump(), **update_data})
+            store.students[i] = updated_student
+            _record_change("students", "update", student.id, updated_student.model_dump())
+            updated.append(student.id)
+
+    if updated:
+        _log_activity("updated students", f"{len(updated)} students")
+    return _bulk_outcomes(selector, updated, "updated")
+
+def delete_students_bulk(selector: StudentBulkSelector) -> List[Dict[str, str]]:
+    store = _tenant()
+    ids = set(selector.ids) if selector.ids is not None else None
+    query = selector.query.lower() if selector.query else None
+
+    kept: List[Student] = []
+    deleted: List[str] = []
+    for student in store.students:
+        if _student_selected(student, selector, ids, query):
+            deleted.append(student.id)
+        else:
+            kept.append(student)
+    store.students = kept
+
+    for student_id in deleted:
+        _record_change("students", "delete", student_id)
+    if deleted:
+        _log_activity("removed students", f"{len(deleted)} students")
+    return _bulk_outcomes(selector, deleted, "deleted")
+
 def add_class(class_data: ClassCreate) -> Class:
-    class_id = str(uuid.uuid4())[:8]
+    store = _tenant()
+    class_id = new_id()
     new_class = Class(
         id=class_id,
         **class_data.model_dump()
     )
-    CLASSES.append(new_class)
+    store.classes.append(new_class)
+    _record_change("classes", "insert", new_class.id, new_class.model_dump())
     return new_class
 
 def update_class(class_id: str, class_data: ClassUpdate) -> Optional[Class]:
-    for i, cls in enumerate(CLASSES):
+    store = _tenant()
+    for i, cls in enumerate(store.classes):
         if cls.id == class_id:
             # Update only provided fields
             update_data = {k: v for k, v in class_data.model_dump().items() if v is not None}
             updated_class = Class(**{**cls.model_dump(), **update_data})
-            CLASSES[i] = updated_class
+            store.classes[i] = updated_class
+            _record_change("classes", "update", class_id, updated_class.model_dump())
             return updated_class
     return None
 
 def delete_class(class_id: str) -> bool:
-    global CLASSES
-    original_length = len(CLASSES)
-    CLASSES = [cls for cls in CLASSES if cls.id != class_id]
-    return len(CLASSES) < original_length
+    store = _tenant()
+    original_length = len(store.classes)
+    store.classes = [cls for cls in store.classes if cls.id != class_id]
+    if len(store.classes) < original_length:
+        _record_change("classes", "delete", class_id)
+        return True
+    return False
 
 def add_teacher(teacher_data: TeacherCreate) -> Teacher:
-    teacher_id = str(uuid.uuid4())[:8]
+    store = _tenant()
+    teacher_id = new_id()
     new_teacher = Teacher(
         id=teacher_id,
         **teacher_data.model_dump()
     )
-    TEACHERS.append(new_teacher)
+    store.teachers.append(new_teacher)
+    _record_change("teachers", "insert", new_teacher.id, new_teacher.model_dump())
     
-    # Create activity log for new teacher addition
-    activity_id = str(uuid.uuid4())[:8]
-    new_activity = ActivityItem(
-        id=activity_id,
-        userId="1",  # Admin user
-        userName="Admin User",
-        userAvatar="/placeholder.svg",
-        action="added new teacher",
-        target=new_teacher.name,
-        date=datetime.now().isoformat(),
-        type="system"
-    )
-    ACTIVITIES.insert(0, new_activity)
+    _log_activity("added new teacher", new_teacher.name)
     
     return new_teacher
 
+def add_teachers_bulk(teachers_data: List[TeacherCreate]) -> List[Teacher]:
+    store = _tenant()
+    new_teachers = [
+        Teacher.model_construct(id=new_id(), **teacher_data.model_dump())
+        for teacher_data in teachers_data
+    ]
+    store.teachers.extend(new_teachers)
+    _record_changes("teachers", "insert", [(teacher.id, teacher.model_dump()) for teacher in new_teachers])
+    if new_teachers:
+        _log_activity("imported teachers", f"{len(new_teachers)} teachers")
+    return new_teachers
+
 def update_teacher(teacher_id: str, teacher_data: TeacherUpdate) -> Optional[Teacher]:
-    for i, teacher in enumerate(TEACHERS):
+    store = _tenant()
+    for i, teacher in enumerate(store.teachers):
         if teacher.id == teacher_id:
             # Update only provided fields
             update_data = {k: v for k, v in teacher_data.model_dump().items() if v is not None}
             updated_teacher = Teacher(**{**teacher.model_dump(), **update_data})
-            TEACHERS[i] = updated_teacher
+            store.teachers[i] = updated_teacher
+            _record_change("teachers", "update", teacher_id, updated_teacher.model_dump())
             
-            # Create activity log for teacher update
-            activity_id = str(uuid.uuid4())[:8]
-            new_activity = ActivityItem(
-                id=activity_id,
-                userId="1",  # Admin user
-                userName="Admin User",
-                userAvatar="/placeholder.svg",
-                action="updated teacher",
-                target=updated_teacher.name,
-                date=datetime.now().isoformat(),
-                type="system"
-            )
-            ACTIVITIES.insert(0, new_activity)
+            _log_activity("updated teacher", updated_teacher.name)
             
             return updated_teacher
     return None
 
 def delete_teacher(teacher_id: str) -> bool:
-    global TEACHERS
+    store = _tenant()
     # Find the teacher first to get their name for the activity log
-    teacher = next((t for t in TEACHERS if t.id == teacher_id), None)
+    teacher = next((t for t in store.teachers if t.id == teacher_id), None)
     if not teacher:
         return False
     
     teacher_name = teacher.name
-    original_length = len(TEACHERS)
-    TEACHERS = [t for t in TEACHERS if t.id != teacher_id]
+    original_length = len(store.teachers)
+    store.teachers = [t for t in store.teachers if t.id != teacher_id]
     
-    if len(TEACHERS) < original_length:
-        # Create activity log for teacher deletion
-        activity_id = str(uuid.uuid4())[:8]
-        new_activity = ActivityItem(
-            id=activity_id,
-            userId="1",  # Admin user
-            userName="Admin User",
-            userAvatar="/placeholder.svg",
-            action="removed teacher",
-            target=teacher_name,
-            date=datetime.now().isoformat(),
-            type="system"
-        )
-        ACTIVITIES.insert(0, new_activity)
+    if len(store.teachers) < original_length:
+        _record_change("teachers", "delete", teacher_id)
+        _log_activity("removed teacher", teacher_name)
         return True
     
     return False
 
 def update_student(student_id: str, student_data: StudentCreate) -> Optional[Student]:
-    for i, student in enumerate(STUDENTS):
+    store = _tenant()
+    for i, student in enumerate(store.students):
         if student.id == student_id:
             # Update only provided fields, preserving existing data where needed
             update_data = {k: v for k, v in student_data.model_dump().items() if v is not None}
@@ -506,50 +952,28 @@ def update_student(student_id: str, student_data: StudentCreate) -> Optional[Stu
                 update_data['avatar'] = student.avatar
                 
             updated_student = Student(id=student_id, **update_data)
-            STUDENTS[i] = updated_student
+            store.students[i] = updated_student
+            _record_change("students", "update", student_id, updated_student.model_dump())
             
-            # Create activity log for student update
-            activity_id = str(uuid.uuid4())[:8]
-            new_activity = ActivityItem(
-                id=activity_id,
-                userId="1",  # Admin user
-                userName="Admin User",
-                userAvatar="/placeholder.svg",
-                action="updated student",
-                target=updated_student.name,
-                date=datetime.now().isoformat(),
-                type="system"
-            )
-            ACTIVITIES.insert(0, new_activity)
+            _log_activity("updated student", updated_student.name)
             
             return updated_student
     return None
 
 def delete_student(student_id: str) -> bool:
-    global STUDENTS
+    store = _tenant()
     # Find the student first to get their name for the activity log
-    student = next((s for s in STUDENTS if s.id == student_id), None)
+    student = next((s for s in store.students if s.id == student_id), None)
     if not student:
         return False
     
     student_name = student.name
-    original_length = len(STUDENTS)
-    STUDENTS = [s for s in STUDENTS if s.id != student_id]
+    original_length = len(store.students)
+    store.students = [s for s in store.students if s.id != student_id]
     
-    if len(STUDENTS) < original_length:
-        # Create activity log for student deletion
-        activity_id = str(uuid.uuid4())[:8]
-        new_activity = ActivityItem(
-            id=activity_id,
-            userId="1",  # Admin user
-            userName="Admin User",
-            userAvatar="/placeholder.svg",
-            action="removed student",
-            target=student_name,
-            date=datetime.now().isoformat(),
-            type="system"
-        )
-        ACTIVITIES.insert(0, new_activity)
+    if len(store.students) < original_length:
+        _record_change("students", "delete", student_id)
+        _log_activity("removed student", student_name)
         return True
     
     return False
@@ -0,0 +1,33 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Type
+
+from pydantic import BaseModel
+
+# Streaming serializers used by the export endpoints. Each yields one chunk
+# per record so memory stays constant regardless of collection size. Records
+# come from the store's async scans, which read in chunks off the event loop.
+
+async def iter_ndjson(records: AsyncIterable[BaseModel]) -> AsyncIterator[str]:
+    async for record in records:
+        yield record.model_dump_json() + "\n"
+
+async def iter_csv(records: AsyncIterable[BaseModel], model: Type[BaseModel]) -> AsyncIterator[str]:
+    fieldnames = list(model.model_fields.keys())
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for record in records:
+        buffer.seek(0)
+        buffer.truncate(0)
+        row = record.model_dump(mode="json")
+        # Nested values (e.g. class schedules) are written as JSON in a single cell
+        writer.writerow({
+            key: json.dumps(value) if isinstance(value, (list, dict)) else value
+            for key, value in row.items()
+        })
+        yield buffer.getvalue()
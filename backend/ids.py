@@ -0,0 +1,51 @@
+import os
+import threading
+import time
+
+# Time-ordered ids (ULID layout): 48 bits of milliseconds since the epoch
+# followed by 80 random bits, encoded as 26 Crockford base32 characters.
+# Ids sort lexicographically in creation order. Within one millisecond the
+# random part is incremented, so ids from one process are strictly increasing;
+# 80 fresh random bits per millisecond keep separate worker processes apart.
+#
+# The mock seed records in database.py keep their short ids ("1".."5"), which
+# the frontend's fixtures also use; they sort after every generated id.
+
+_ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+def _reset_after_fork() -> None:
+    # A forked worker must not continue the parent's sequence
+    global _lock, _last_ms, _last_random
+    _lock = threading.Lock()
+    _last_ms = 0
+    _last_random = 0
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(26):
+        chars.append(_ENCODING[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def new_id() -> str:
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        elif _last_random < _RANDOM_MAX:
+            # Same millisecond (or the clock went back): keep increasing
+            _last_random += 1
+        else:
+            _last_ms += 1
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        return _encode((_last_ms << _RANDOM_BITS) | _last_random)
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Bulk import helpers: rows are read lazily from the uploaded file and
+# validated in batches so large files never need to be held in memory.
+
+IMPORT_BATCH_SIZE = 500
+
+def iter_rows(file: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    if format == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            if None in row:
+                # More cells than headers: DictReader collects the extras under None
+                yield row_number, None
+                continue
+            # Empty cells mean "not provided" for optional fields
+            yield row_number, {key: value for key, value in row.items() if value != ""}
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError:
+            yield row_number, None
+
+def _validate_batch(
+    batch: List[Tuple[int, Any]],
+    model: Type[BaseModel],
+    adapter: TypeAdapter
+) -> Tuple[List[BaseModel], List[Dict[str, Any]]]:
+    try:
+        # Fast path: the whole batch is valid
+        return adapter.validate_python([row for _, row in batch]), []
+    except ValidationError:
+        pass
+
+    valid, errors = [], []
+    for row_number, row in batch:
+        if not isinstance(row, dict):
+            errors.append({"row": row_number, "errors": ["Malformed row"]})
+            continue
+        try:
+            valid.append(model.model_validate(row))
+        except ValidationError as exc:
+            errors.append({
+                "row": row_number,
+                "errors": [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in exc.errors()
+                ],
+            })
+    return valid, errors
+
+def iter_batches(
+    rows: Iterator[Tuple[int, Any]],
+    model: Type[BaseModel]
+) -> Iterator[Tuple[List[BaseModel], List[Dict[str, Any]]]]:
+    # Yields (valid records, row errors) for every IMPORT_BATCH_SIZE rows read.
+    # Reading and validation need no access to the data, so callers can run
+    # them without holding any lock and only lock around each insert.
+    adapter = TypeAdapter(List[model])
+    batch: List[Tuple[int, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield _validate_batch(batch, model, adapter)
+            batch = []
+    if batch:
+        yield _validate_batch(batch, model, adapter)
@@ -0,0 +1,216 @@
+import operator
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Secondary indexes over students, maintained incrementally from the change feed.
+#
+# Numeric and date fields are kept in sorted (value, id) lists, so a range is
+# found by binary search and costs O(log n + k). grade and status get hash
+# indexes for equality. A filter walks the smallest bucket or range slice and
+# checks the other conditions against the records.
+
+SORTED_FIELDS = {
+    "attendance": int,
+    "averageGrade": int,
+    "enrollmentDate": str,
+    "dateOfBirth": str,
+}
+EQUALITY_FIELDS = ("grade", "status")
+
+_MAX_ID = chr(0x10FFFF)
+_OPERATORS = {"=": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|<|>|=)\s*(.+?)\s*$")
+
+class FilterError(ValueError):
+    pass
+
+def parse_filter(where: str) -> List[Tuple[str, str, Any]]:
+    # "attendance<85,grade=10th" -> [("attendance", "<", 85), ("grade", "=", "10th")]
+    conditions = []
+    for part in where.split(","):
+        if not part.strip():
+            continue
+        match = _CONDITION.match(part)
+        if not match:
+            raise FilterError(f"Invalid condition: {part}")
+        field, op, value = match.groups()
+        if field in SORTED_FIELDS:
+            try:
+                value = SORTED_FIELDS[field](value)
+            except ValueError:
+                raise FilterError(f"Invalid value for {field}: {value}")
+        elif field in EQUALITY_FIELDS:
+            if op != "=":
+                raise FilterError(f"{field} only supports =")
+        else:
+            raise FilterError(f"{field} is not indexed")
+        conditions.append((field, op, value))
+    return conditions
+
+class StudentIndexes:
+    def __init__(self):
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.sorted: Dict[str, List[Tuple[Any, str]]] = {field: [] for field in SORTED_FIELDS}
+        self.equality: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in EQUALITY_FIELDS}
+
+    def remove(self, student_id: str) -> None:
+        record = self.records.pop(student_id, None)
+        if record is None:
+            return
+        for field, entries in self.sorted.items():
+            value = record.get(field)
+            if value is not None:
+                i = bisect_left(entries, (value, student_id))
+                if i < len(entries) and entries[i] == (value, student_id):
+                    del entries[i]
+        for field, buckets in self.equality.items():
+            ids = buckets.get(record[field])
+            if ids is not None:
+                ids.discard(student_id)
+                if not ids:
+                    del buckets[record[field]]
+
+    def upsert(self, student: Dict[str, Any]) -> None:
+        self.remove(student["id"])
+        self.records[student["id"]] = student
+        for field, entries in self.sorted.items():
+            value = student.get(field)
+            if value is not None:
+                insort(entries, (value, student["id"]))
+        for field, buckets in self.equality.items():
+            buckets.setdefault(student[field], set()).add(student["id"])
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        if change["collection"] != "students":
+            return
+        if change["op"] == "delete":
+            self.remove(change["id"])
+        else:
+            self.upsert(change["data"])
+
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> None:
+        # Batched form of apply_change: upserted records are merged into the
+        # sorted lists with one sort per field instead of an insort per record
+        upserts: Dict[str, Dict[str, Any]] = {}
+        for change in changes:
+            if change["collection"] != "students":
+                continue
+            if change["op"] == "delete":
+                upserts.pop(change["id"], None)
+                self.remove(change["id"])
+            else:
+                upserts[change["id"]] = change["data"]
+        if len(upserts) < 2:
+            for student in upserts.values():
+                self.upsert(student)
+            return
+
+        for student_id, student in upserts.items():
+            self.remove(student_id)
+            self.records[student_id] = student
+            for field, buckets in self.equality.items():
+                buckets.setdefault(student[field], set()).add(student_id)
+        for field, entries in self.sorted.items():
+            entries.extend(sorted(
+                (student[field], student_id)
+                for student_id, student in upserts.items()
+                if student.get(field) is not None
+            ))
+            # Two sorted runs: timsort merges them in linear time
+            entries.sort()
+
+    @classmethod
+    def build(cls, students: Iterable[Dict[str, Any]]) -> "StudentIndexes":
+        indexes = cls()
+        for student in students:
+            indexes.records[student["id"]] = student
+            for field, buckets in indexes.equality.items():
+                buckets.setdefault(student[field], set()).add(student["id"])
+        # Sort once instead of inserting one by one
+        for field, entries in indexes.sorted.items():
+            entries.extend(
+                (student[field], student_id)
+                for student_id, student in indexes.records.items()
+                if student.get(field) is not None
+            )
+            entries.sort()
+        return indexes
+
+    def _slice_bounds(self, field: str, op: str, value: Any) -> Tuple[int, int]:
+        entries = self.sorted[field]
+        # (value, "") sorts before and (value, _MAX_ID) after every entry with that value
+        low = bisect_left(entries, (value, ""))
+        high = bisect_right(entries, (value, _MAX_ID), lo=low)
+        if op == "=":
+            return low, high
+        if op == "<":
+            return 0, low
+        if op == "<=":
+            return 0, high
+        if op == ">":
+            return high, len(entries)
+        return low, len(entries)
+
+    def _driver(self, field: str, op: str, value: Any) -> Tuple[int, Iterable[str]]:
+        # Size and ids of the records matching one condition, without materializing them
+        if field in self.equality:
+            ids = self.equality[field].get(value, ())
+            return len(ids), ids
+        low, high = self._slice_bounds(field, op, value)
+        entries = self.sorted[field]
+        return high - low, (entries[i][1] for i in range(low, high))
+
+    @staticmethod
+    def _matches(record: Dict[str, Any], conditions: List[Tuple[str, str, Any]]) -> bool:
+        for field, op, value in conditions:
+            actual = record.get(field)
+            if actual is None or not _OPERATORS[op](actual, value):
+                return False
+        return True
+
+    def search(
+        self,
+        conditions: List[Tuple[str, str, Any]],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        # The most selective condition drives the search: its bucket or sorted
+        # slice is found in O(log n) and only its k ids are checked against the
+        # other conditions, so a filter costs O(log n + k) however many ranges it has
+        driver_size, driver_ids = len(self.records), self.records.keys()
+        rest = conditions
+        if conditions:
+            drivers = [self._driver(*condition) for condition in conditions]
+            best = min(range(len(conditions)), key=lambda i: drivers[i][0])
+            driver_size, driver_ids = drivers[best]
+            rest = conditions[:best] + conditions[best + 1:]
+
+        if order_by is None or (limit is not None and driver_size * 2 > len(self.records)):
+            # Unordered, or the filter keeps most records: walk the driver (or the
+            # sort index) and stop after k matches
+            if order_by is None:
+                walk = driver_ids
+                check = rest
+            else:
+                entries = self.sorted[order_by]
+                walk = (student_id for _, student_id in (reversed(entries) if descending else entries))
+                check = conditions
+            results = []
+            for student_id in walk:
+                if limit is not None and len(results) >= limit:
+                    break
+                record = self.records[student_id]
+                if self._matches(record, check):
+                    results.append(record)
+            return results
+
+        # Few matches: collect them and sort just those
+        results = [
+            self.records[student_id] for student_id in driver_ids
+            if self._matches(self.records[student_id], rest)
+            and self.records[student_id].get(order_by) is not None
+        ]
+        results.sort(key=lambda record: (record[order_by], record["id"]), reverse=descending)
+        return results[:limit] if limit is not None else results
@@ -0,0 +1,266 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ids import new_id
+from reports import JOB_KINDS
+
+# Background jobs for heavy reports. Jobs run on a process pool so the API's
+# event loop stays responsive. Each job is persisted in FOCUS_JOBS_DIR as
+#   <id>.json        metadata and status
+#   <id>.input.json  the data snapshot the job runs on
+#   <id>.result      the finished report
+#   <id>.progress    progress written by the worker process while it runs
+#   <id>.cancel      present once the job was cancelled
+#   <id>.lock        flocked by the server process that runs the job
+# so queued and interrupted jobs are picked up again after a restart.
+#
+# Several server workers can share the directory: status is always read from
+# the files, and a job only runs in the process holding its lock. The lock is
+# released when that process exits, so resume() in any worker can claim it.
+
+JOBS_DIR = os.environ.get("FOCUS_JOBS_DIR") or os.path.join(tempfile.gettempdir(), "focus-jobs")
+# Pool processes per server worker; main.py splits the cores across workers
+MAX_WORKERS = int(os.environ.get("FOCUS_JOB_WORKERS") or os.cpu_count() or 1)
+
+class JobCancelled(Exception):
+    pass
+
+_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+# Open lock files of the jobs this process runs
+_claims: Dict[str, Any] = {}
+_executor: Optional[ProcessPoolExecutor] = None
+_shutting_down = False
+
+def _path(name: str) -> str:
+    return os.path.join(JOBS_DIR, name)
+
+def _run(kind: str, job_id: str, students: List[Dict[str, Any]], params: Dict[str, Any], jobs_dir: str) -> str:
+    # Runs in a worker process
+    cancel_path = os.path.join(jobs_dir, f"{job_id}.cancel")
+    progress_path = os.path.join(jobs_dir, f"{job_id}.progress")
+
+    def progress(fraction: float) -> None:
+        if os.path.exists(cancel_path):
+            raise JobCancelled()
+        with open(progress_path + ".tmp", "w") as out:
+            out.write(str(fraction))
+        os.replace(progress_path + ".tmp", progress_path)
+
+    progress(0.0)
+    return JOB_KINDS[kind][0](students, params, progress)
+
+def _save(job: Dict[str, Any]) -> None:
+    with open(_path(f"{job['id']}.json.tmp"), "w") as out:
+        json.dump(job, out)
+    os.replace(_path(f"{job['id']}.json.tmp"), _path(f"{job['id']}.json"))
+
+def _load(job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_path(f"{job_id}.json")) as data:
+            return json.load(data)
+    except FileNotFoundError:
+        return None
+
+def _remove(name: str) -> None:
+    try:
+        os.remove(_path(name))
+    except FileNotFoundError:
+        pass
+
+def _claim(job_id: str) -> bool:
+    # Takes the job's lock without waiting; False if another process holds it
+    lock_file = open(_path(f"{job_id}.lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _claims[job_id] = lock_file
+    return True
+
+def _unclaim(job_id: str) -> None:
+    lock_file = _claims.pop(job_id, None)
+    if lock_file is not None:
+        lock_file.close()
+
+def _ensure_started() -> None:
+    global _executor
+    if _executor is not None:
+        return
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    # spawn avoids forking the server's threads into the workers
+    context = multiprocessing.get_context("spawn")
+    _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context)
+
+def _finish(job_id: str, future: Future) -> None:
+    if _shutting_down:
+        # Leave the job queued on disk so resume() picks it up next time
+        return
+    with _lock:
+        job = _load(job_id)
+        _futures.pop(job_id, None)
+        if future.cancelled():
+            job["status"] = "cancelled"
+        else:
+            error = future.exception()
+            if isinstance(error, JobCancelled):
+                job["status"] = "cancelled"
+            elif error is not None:
+                job["status"] = "failed"
+                job["error"] = str(error)
+            else:
+                with open(_path(f"{job_id}.result"), "w") as out:
+                    out.write(future.result())
+                job["status"] = "completed"
+                job["progress"] = 1.0
+        job["finishedAt"] = datetime.now().isoformat()
+        _save(job)
+        for suffix in ("input.json", "progress", "cancel", "lock"):
+            _remove(f"{job_id}.{suffix}")
+        _unclaim(job_id)
+
+def _restart() -> None:
+    # A pool whose worker died refuses new work; replace it with a fresh one
+    # (its futures have all been failed already, so nothing is left to cancel)
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _ensure_started()
+
+def _dispatch(job: Dict[str, Any], students: List[Dict[str, Any]]) -> None:
+    # Called with _lock held and the job claimed
+    try:
+        future = _executor.submit(_run, job["kind"], job["id"], students, job["params"], JOBS_DIR)
+    except BrokenProcessPool:
+        _restart()
+        try:
+            future = _executor.submit(_run, job["kind"], job["id"], students, job["params"], JOBS_DIR)
+        except BrokenProcessPool as exc:
+            job["status"] = "failed"
+            job["error"] = f"Job could not be started: {exc}"
+            job["finishedAt"] = datetime.now().isoformat()
+            _save(job)
+            for suffix in ("input.json", "lock"):
+                _remove(f"{job['id']}.{suffix}")
+            _unclaim(job["id"])
+            return
+    _futures[job["id"]] = future
+    future.add_done_callback(lambda f, job_id=job["id"]: _finish(job_id, f))
+
+def submit(kind: str, params: Dict[str, Any], students: List[Dict[str, Any]], tenant: str) -> Dict[str, Any]:
+    _ensure_started()
+    job = {
+        "id": new_id(),
+        "kind": kind,
+        "params": params,
+        "tenant": tenant,
+        "status": "queued",
+        "progress": 0.0,
+        "format": JOB_KINDS[kind][1],
+        "createdAt": datetime.now().isoformat(),
+        "finishedAt": None,
+        "error": None,
+    }
+    with open(_path(f"{job['id']}.input.json"), "w") as out:
+        json.dump(students, out)
+    with _lock:
+        _claim(job["id"])
+        _save(job)
+        _dispatch(job, students)
+    return job
+
+def get_job(job_id: str, tenant: str) -> Optional[Dict[str, Any]]:
+    job = _load(job_id)
+    if job is None or job["tenant"] != tenant:
+        return None
+    if job["status"] in ("queued", "running"):
+        try:
+            with open(_path(f"{job_id}.progress")) as data:
+                job["progress"] = float(data.read() or 0)
+            job["status"] = "running"
+        except (FileNotFoundError, ValueError):
+            pass
+    return job
+
+def list_jobs(tenant: str) -> List[Dict[str, Any]]:
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    job_ids = sorted(
+        name[:-len(".json")] for name in os.listdir(JOBS_DIR)
+        if name.endswith(".json") and not name.endswith(".input.json")
+    )
+    return [job for job in (get_job(job_id, tenant) for job_id in job_ids) if job is not None]
+
+def cancel(job_id: str, tenant: str) -> Optional[Dict[str, Any]]:
+    job = get_job(job_id, tenant)
+    if job is None:
+        return None
+    if job["status"] in ("queued", "running"):
+        # Seen by whichever worker process runs the job at its next progress check
+        open(_path(f"{job_id}.cancel"), "a").close()
+        future = _futures.get(job_id)
+        if future is not None:
+            future.cancel()
+    return get_job(job_id, tenant)
+
+def result_path(job_id: str, tenant: str) -> Optional[str]:
+    job = get_job(job_id, tenant)
+    if job is None or job["status"] != "completed":
+        return None
+    return _path(f"{job_id}.result")
+
+def start() -> None:
+    # Starting the pool is too slow for a request
+    _ensure_started()
+    resume()
+
+def resume() -> None:
+    # Requeue the jobs that never finished and that no live process is running
+    if not os.path.isdir(JOBS_DIR):
+        return
+    for name in os.listdir(JOBS_DIR):
+        if not name.endswith(".json") or name.endswith(".input.json"):
+            continue
+        job_id = name[:-len(".json")]
+        with _lock:
+            if job_id in _claims or not _claim(job_id):
+                continue
+            # Re-read under the lock: another worker may have finished it meanwhile
+            job = _load(job_id)
+            if job is None or job["status"] not in ("queued", "running"):
+                _unclaim(job_id)
+                continue
+            try:
+                with open(_path(f"{job_id}.input.json")) as data:
+                    students = json.load(data)
+            except FileNotFoundError:
+                job["status"] = "failed"
+                job["error"] = "Job input was lost"
+                _save(job)
+                _unclaim(job_id)
+                continue
+            _ensure_started()
+            job["status"] = "queued"
+            job["progress"] = 0.0
+            _remove(f"{job_id}.progress")
+            _save(job)
+            _dispatch(job, students)
+
+def shutdown() -> None:
+    global _executor, _shutting_down
+    if _executor is not None:
+        _shutting_down = True
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    for job_id in list(_claims):
+        _unclaim(job_id)
@@ -1,29 +1,54 @@
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.responses import Response
+from fastapi.dependencies.utils import request_params_to_args
+from fastapi.routing import APIRoute, serialize_response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import QueryParams
+from starlette.routing import Match
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import tempfile
 import uvicorn
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Literal
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 
 from models import (
-    User, UserCreate, UserLogin, UserRole,
-    Student, StudentCreate, 
+    User, UserCreate, UserLogin, UserRole, RefreshRequest, LogoutRequest,
+    Student, StudentCreate, StudentBulkSelector, StudentBulkUpdate,
     Teacher, TeacherCreate, TeacherUpdate,
     Class, ClassCreate, ClassUpdate,
     Attendance, Grade, Payment, Notification, Message,
-    ActivityItem, DashboardStats
+    ActivityItem, DashboardStats,
+    BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem,
+    SyncResponse, ImportResult, BulkResult, Job, JobCreate,
+    RollupDimension, RollupRow, RollupRebuildResult
 )
-from database import (
-    get_users, get_students, get_teachers, get_classes, get_activities,
-    add_student, add_teacher, update_teacher, delete_teacher, 
-    update_student, delete_student,
-    add_class, update_class, delete_class, get_dashboard_stats,
-    get_user_by_email, authenticate_user
+from database import get_user_by_email, get_user_tenant, CURRENT_TENANT
+from store import Store, get_store
+from indexes import SORTED_FIELDS, FilterError, parse_filter
+from export import iter_ndjson, iter_csv
+from importer import iter_rows
+import shared_state
+import jobs
+from compression import CompressionMiddleware
+from auth import (
+    create_access_token, get_current_user, oauth2_scheme,
+    ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
 
 app = FastAPI(title="Focus School Management API")
 
+# Compress JSON responses of 1 KB or more for clients that accept it
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,10 +58,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multi-worker mode: all workers share one dataset through the state directory
+if os.environ.get("FOCUS_STATE_DIR"):
+    shared_state.enable(os.environ["FOCUS_STATE_DIR"])
+
+@app.middleware("http")
+async def shared_state_middleware(request, call_next):
+    if not shared_state.is_enabled():
+        return await call_next(request)
+    # Catch up with the other workers off the event loop. Writes take the
+    # cross-process lock themselves, only while they run (store.Connection.write).
+    await run_in_threadpool(shared_state.sync)
+    return await call_next(request)
+
+@app.on_event("startup")
+async def start_jobs():
+    # Start the job pool now rather than on the first POST /api/jobs
+    await run_in_threadpool(jobs.start)
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    jobs.shutdown()
+
+# Field projection (?fields=name,grade) for list and detail endpoints
+def _parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" in model.model_fields and "id" not in names:
+        names.insert(0, "id")
+    return names
+
+def _projected_response(content) -> JSONResponse:
+    # Projected rows skip response_model validation of the omitted fields
+    return JSONResponse(jsonable_encoder(content))
+
 # Authentication endpoints
 @app.post("/api/auth/login", response_model=dict)
-async def login(user_data: UserLogin):
-    user = authenticate_user(user_data.email, user_data.password)
+async def login(user_data: UserLogin, store: Store = Depends(get_store)):
+    user = await store.users.authenticate(user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,66 +107,181 @@ async def login(user_data: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    tenant = get_user_tenant(user.email)
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.email, "tenant": tenant}, expires_delta=access_token_expires
+    )
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": await store.sessions.create_refresh_token(user.email, tenant),
+        "token_type": "bearer",
+        "user": user
+    }
+
+@app.post("/api/auth/refresh", response_model=dict)
+async def refresh(refresh_data: RefreshRequest, store: Store = Depends(get_store)):
+    # Rotates the refresh token and issues a new access token without a password check
+    session = await store.sessions.rotate_refresh_token(refresh_data.refresh_token)
+    user = get_user_by_email(session["email"]) if session else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "tenant": session["tenant"]}, expires_delta=access_token_expires
     )
     
     return {
         "access_token": access_token,
+        "refresh_token": session["refresh_token"],
         "token_type": "bearer",
         "user": user
     }
 
+@app.post("/api/auth/logout", response_model=dict)
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    await store.sessions.revoke(token, logout_data.refresh_token if logout_data else None)
+    return {"success": True}
+
 # Dashboard endpoints
 @app.get("/api/dashboard/stats", response_model=DashboardStats)
-async def get_stats(current_user: User = Depends(get_current_user)):
-    return get_dashboard_stats(current_user.role)
+async def get_stats(
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    return await store.dashboard_stats(current_user.role)
 
 @app.get("/api/dashboard/activity", response_model=List[ActivityItem])
 async def get_recent_activity(
     limit: int = 5, 
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    return get_activities(limit)
+    projection = _parse_fields(fields, ActivityItem)
+    activities = await store.activities.list(limit, projection)
+    if projection:
+        return _projected_response(activities)
+    return activities
 
 # Students endpoints
 @app.get("/api/students", response_model=List[Student])
 async def list_students(
     query: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    projection = _parse_fields(fields, Student)
+    records = await store.students.list(query, projection)
+    if projection:
+        return _projected_response(records)
+    return records
+
+@app.get("/api/students/search", response_model=List[Student])
+async def search_students_endpoint(
+    where: Optional[str] = None,
+    order_by: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    return get_students(query)
+    # e.g. ?where=attendance<85,grade=10th or ?order_by=averageGrade&limit=10
+    try:
+        conditions = parse_filter(where) if where else []
+    except FilterError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if order_by is not None and order_by not in SORTED_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot order by {order_by}")
+    
+    projection = _parse_fields(fields, Student)
+    results = await store.students.search(conditions, order_by, order == "desc", limit, projection)
+    if projection:
+        return _projected_response(results)
+    return results
 
 @app.get("/api/students/{student_id}", response_model=Student)
 async def get_student(
     student_id: str,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    student = next((s for s in get_students() if s.id == student_id), None)
+    projection = _parse_fields(fields, Student)
+    student = await store.students.get(student_id, projection)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
+    if projection:
+        return _projected_response(student)
     return student
 
 @app.post("/api/students", response_model=Student)
 async def create_student(
     student: StudentCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    return add_student(student)
+    return await store.students.add(student)
+
+def _require_selector(selector: StudentBulkSelector) -> None:
+    # Refuse to touch every student when no selector was given
+    if selector.ids is None and not selector.query and selector.grade is None and selector.status is None:
+        raise HTTPException(status_code=400, detail="Provide ids or a filter")
+
+@app.patch("/api/students/bulk", response_model=BulkResult)
+async def bulk_update_students(
+    bulk_data: StudentBulkUpdate,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    _require_selector(bulk_data)
+    if not bulk_data.changes.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="No changes given")
+    
+    results = await store.students.update_bulk(bulk_data, bulk_data.changes)
+    return {"count": sum(r["status"] == "updated" for r in results), "results": results}
+
+@app.delete("/api/students/bulk", response_model=BulkResult)
+async def bulk_delete_students(
+    selector: StudentBulkSelector,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    _require_selector(selector)
+    
+    results = await store.students.delete_bulk(selector)
+    return {"count": sum(r["status"] == "deleted" for r in results), "results": results}
 
 @app.put("/api/students/{student_id}", response_model=Student)
 async def update_student_endpoint(
     student_id: str,
     student_data: StudentCreate,  # Using StudentCreate for now
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    updated_student = update_student(student_id, student_data)
+    updated_student = await store.students.update(student_id, student_data)
     if not updated_student:
         raise HTTPException(status_code=404, detail="Student not found")
     return updated_student
@@ -111,12 +289,13 @@ async def update_student_endpoint(
 @app.delete("/api/students/{student_id}", response_model=dict)
 async def delete_student_endpoint(
     student_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    success = delete_student(student_id)
+    success = await store.students.delete(student_id)
     if not success:
         raise HTTPException(status_code=404, detail="Student not found")
     return {"success": True}
@@ -125,39 +304,52 @@ async def delete_student_endpoint(
 @app.get("/api/teachers", response_model=List[Teacher])
 async def list_teachers(
     query: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    return get_teachers(query)
+    projection = _parse_fields(fields, Teacher)
+    records = await store.teachers.list(query, projection)
+    if projection:
+        return _projected_response(records)
+    return records
 
 @app.get("/api/teachers/{teacher_id}", response_model=Teacher)
 async def get_teacher(
     teacher_id: str,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    teacher = next((t for t in get_teachers() if t.id == teacher_id), None)
+    projection = _parse_fields(fields, Teacher)
+    teacher = await store.teachers.get(teacher_id, projection)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
+    if projection:
+        return _projected_response(teacher)
     return teacher
 
 @app.post("/api/teachers", response_model=Teacher)
 async def create_teacher(
     teacher: TeacherCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    return add_teacher(teacher)
+    return await store.teachers.add(teacher)
 
 @app.put("/api/teachers/{teacher_id}", response_model=Teacher)
 async def update_teacher_endpoint(
     teacher_id: str,
     teacher_data: TeacherUpdate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    updated_teacher = update_teacher(teacher_id, teacher_data)
+    updated_teacher = await store.teachers.update(teacher_id, teacher_data)
     if not updated_teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return updated_teacher
@@ -165,12 +357,13 @@ async def update_teacher_endpoint(
 @app.delete("/api/teachers/{teacher_id}", response_model=dict)
 async def delete_teacher_endpoint(
     teacher_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    success = delete_teacher(teacher_id)
+    success = await store.teachers.delete(teacher_id)
     if not success:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return {"success": True}
@@ -179,39 +372,52 @@ async def delete_teacher_endpoint(
 @app.get("/api/classes", response_model=List[Class])
 async def list_classes(
     query: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    return get_classes(query)
+    projection = _parse_fields(fields, Class)
+    records = await store.classes.list(query, projection)
+    if projection:
+        return _projected_response(records)
+    return records
 
 @app.get("/api/classes/{class_id}", response_model=Class)
 async def get_class(
     class_id: str,
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
-    class_item = next((c for c in get_classes() if c.id == class_id), None)
+    projection = _parse_fields(fields, Class)
+    class_item = await store.classes.get(class_id, projection)
     if not class_item:
         raise HTTPException(status_code=404, detail="Class not found")
+    if projection:
+        return _projected_response(class_item)
     return class_item
 
 @app.post("/api/classes", response_model=Class)
 async def create_class(
     class_data: ClassCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    return add_class(class_data)
+    return await store.classes.add(class_data)
 
 @app.put("/api/classes/{class_id}", response_model=Class)
 async def update_class_endpoint(
     class_id: str,
     class_data: ClassUpdate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    updated_class = update_class(class_id, class_data)
+    updated_class = await store.classes.update(class_id, class_data)
     if not updated_class:
         raise HTTPException(status_code=404, detail="Class not found")
     return updated_class
@@ -219,15 +425,285 @@ async def update_class_endpoint(
 @app.delete("/api/classes/{class_id}", response_model=dict)
 async def delete_class_endpoint(
     class_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
 ):
     if current_user.role not in ["admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    success = delete_class(class_id)
+    success = await store.classes.delete(class_id)
     if not success:
         raise HTTPException(status_code=404, detail="Class not found")
     return {"success": True}
 
+# Export endpoints
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _export_response(records, model, name: str, format: str) -> StreamingResponse:
+    if format == "csv":
+        body = iter_csv(records, model)
+    else:
+        body = iter_ndjson(records)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+@app.get("/api/export/students")
+async def export_students(
+    query: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _export_response(store.students.scan(query), Student, "students", format)
+
+@app.get("/api/export/teachers")
+async def export_teachers(
+    query: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _export_response(store.teachers.scan(query), Teacher, "teachers", format)
+
+@app.get("/api/export/classes")
+async def export_classes(
+    query: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _export_response(store.classes.scan(query), Class, "classes", format)
+
+@app.get("/api/export/activities")
+async def export_activities(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return _export_response(store.activities.scan(), ActivityItem, "activities", format)
+
+# Import endpoints
+@app.post("/api/import/students", response_model=ImportResult)
+async def import_students(
+    file: UploadFile = File(...),
+    format: Literal["ndjson", "csv"] = "csv",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return await store.students.import_rows(iter_rows(file.file, format))
+
+@app.post("/api/import/teachers", response_model=ImportResult)
+async def import_teachers(
+    file: UploadFile = File(...),
+    format: Literal["ndjson", "csv"] = "csv",
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return await store.teachers.import_rows(iter_rows(file.file, format))
+
+# Analytics endpoints
+@app.get("/api/analytics/rollups", response_model=List[RollupRow])
+async def get_rollups(
+    dimension: RollupDimension = "grade",
+    grade: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return await store.rollups(dimension, grade)
+
+@app.post("/api/analytics/rollups/rebuild", response_model=RollupRebuildResult)
+async def rebuild_rollups_endpoint(
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    mismatches = await store.rebuild_rollups()
+    return {"verified": not mismatches, "mismatches": mismatches}
+
+# Background job endpoints
+JOB_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+def _submit_job(kind: str, params: Dict[str, Any], students: List[Student], tenant: str) -> Dict[str, Any]:
+    return jobs.submit(kind, params, [student.model_dump() for student in students], tenant)
+
+@app.post("/api/jobs", response_model=Job)
+async def create_job(
+    job_data: JobCreate,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    students = await store.students.list()
+    # Dumping the snapshot and writing it out are too slow for the event loop
+    return await run_in_threadpool(_submit_job, job_data.kind, job_data.params, students, CURRENT_TENANT.get())
+
+@app.get("/api/jobs", response_model=List[Job])
+async def list_jobs(current_user: User = Depends(get_current_user)):
+    return await run_in_threadpool(jobs.list_jobs, CURRENT_TENANT.get())
+
+@app.get("/api/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = await run_in_threadpool(jobs.get_job, job_id, CURRENT_TENANT.get())
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/api/jobs/{job_id}", response_model=Job)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role not in ["admin", "teacher"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job = await run_in_threadpool(jobs.cancel, job_id, CURRENT_TENANT.get())
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/result")
+async def download_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = await run_in_threadpool(jobs.get_job, job_id, CURRENT_TENANT.get())
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    path = await run_in_threadpool(jobs.result_path, job_id, CURRENT_TENANT.get())
+    if not path:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(
+        path,
+        media_type=JOB_MEDIA_TYPES[job["format"]],
+        filename=f"{job['kind']}-{job_id}.{job['format']}",
+    )
+
+# Sync endpoint
+@app.get("/api/sync", response_model=SyncResponse)
+async def sync(
+    since: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    return await store.changes_since(since)
+
+# Batch endpoint
+MAX_BATCH_REQUESTS = 20
+
+def _match_get_route(path: str):
+    scope = {"type": "http", "method": "GET", "path": path}
+    for route in app.router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route, child_scope.get("path_params", {})
+    return None, {}
+
+async def _run_batch_item(item: BatchRequestItem, current_user: User, store: Store) -> BatchResponseItem:
+    url = urlsplit(item.path)
+    route, path_params = _match_get_route(url.path)
+    if route is None:
+        return BatchResponseItem(id=item.id, path=item.path, status=404, body={"detail": "Not Found"})
+
+    # Path and query parameters are validated the same way FastAPI does for a
+    # real request, so sub-requests get the same types, defaults and 422s
+    path_values, path_errors = request_params_to_args(route.dependant.path_params, path_params)
+    query_values, query_errors = request_params_to_args(route.dependant.query_params, QueryParams(url.query))
+    errors = path_errors + query_errors
+    if errors:
+        return BatchResponseItem(id=item.id, path=item.path, status=422, body={"detail": jsonable_encoder(errors)})
+
+    # Sub-requests reuse the batch's authenticated user and store connection
+    # instead of re-running the dependencies
+    signature = inspect.signature(route.endpoint)
+    kwargs = {**path_values, **query_values}
+    if "current_user" in signature.parameters:
+        kwargs["current_user"] = current_user
+    if "store" in signature.parameters:
+        kwargs["store"] = store
+
+    try:
+        result = await route.endpoint(**kwargs)
+        if isinstance(result, JSONResponse):
+            body = json.loads(result.body)
+        elif isinstance(result, Response):
+            # Exports and job results stream files; they can't be embedded in a batch
+            return BatchResponseItem(
+                id=item.id, path=item.path, status=400, body={"detail": "Only JSON endpoints can be batched"}
+            )
+        else:
+            # Filtered through the route's response_model exactly as a direct
+            # request would be, so fields the model leaves out stay out
+            body = await serialize_response(
+                field=route.response_field,
+                response_content=result,
+                include=route.response_model_include,
+                exclude=route.response_model_exclude,
+                by_alias=route.response_model_by_alias,
+                exclude_unset=route.response_model_exclude_unset,
+                exclude_defaults=route.response_model_exclude_defaults,
+                exclude_none=route.response_model_exclude_none,
+            )
+    except HTTPException as exc:
+        return BatchResponseItem(id=item.id, path=item.path, status=exc.status_code, body={"detail": exc.detail})
+    except Exception:
+        # A failing sub-request must not take the rest of the batch down with it
+        return BatchResponseItem(id=item.id, path=item.path, status=500, body={"detail": "Internal Server Error"})
+    return BatchResponseItem(id=item.id, path=item.path, status=200, body=body)
+
+@app.post("/api/batch", response_model=BatchResponse)
+async def batch(
+    batch_data: BatchRequest,
+    current_user: User = Depends(get_current_user),
+    store: Store = Depends(get_store)
+):
+    if len(batch_data.requests) > MAX_BATCH_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REQUESTS} requests per batch")
+
+    responses = await asyncio.gather(
+        *(_run_batch_item(item, current_user, store) for item in batch_data.requests)
+    )
+    return BatchResponse(responses=list(responses))
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Run N worker processes over a shared dataset (disables reload)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        os.environ.setdefault("FOCUS_STATE_DIR", tempfile.mkdtemp(prefix="focus-state-"))
+        # Every worker has its own job pool; share the cores between them
+        os.environ.setdefault("FOCUS_JOB_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+        uvicorn.run("main:app", host="0.0.0.0", port=args.port, workers=args.workers)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=args.port, reload=True)
@@ -1,6 +1,6 @@
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Union, Literal
+from typing import Any, List, Optional, Union, Literal
 from datetime import datetime
 import uuid
 
@@ -27,6 +27,12 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class User(UserBase):
     id: str
     avatar: Optional[str] = None
@@ -59,6 +65,29 @@ class Student(StudentBase):
     attendance: Optional[int] = None
     averageGrade: Optional[int] = None
 
+class StudentUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    grade: Optional[str] = None
+    status: Optional[Literal["active", "inactive"]] = None
+    enrollmentDate: Optional[str] = None
+    parentId: Optional[str] = None
+    avatar: Optional[str] = None
+    address: Optional[str] = None
+    phoneNumber: Optional[str] = None
+    dateOfBirth: Optional[str] = None
+    attendance: Optional[int] = None
+    averageGrade: Optional[int] = None
+
+class StudentBulkSelector(BaseModel):
+    ids: Optional[List[str]] = None
+    query: Optional[str] = None
+    grade: Optional[str] = None
+    status: Optional[Literal["active", "inactive"]] = None
+
+class StudentBulkUpdate(StudentBulkSelector):
+    changes: StudentUpdate
+
 # Teacher Models
 class TeacherBase(BaseModel):
     name: str
@@ -182,6 +211,89 @@ class DashboardStats(BaseModel):
     pendingPayments: int
     upcomingEvents: int
 
+# Batch Models
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    path: str
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    path: str
+    status: int
+    body: Any = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
+
+# Sync Models
+class ChangeEntry(BaseModel):
+    seq: int
+    collection: Literal["students", "teachers", "classes"]
+    op: Literal["insert", "update", "delete"]
+    id: str
+    data: Optional[dict] = None
+
+class SyncResponse(BaseModel):
+    version: int
+    full: bool
+    changes: List[ChangeEntry] = []
+    students: Optional[List[Student]] = None
+    teachers: Optional[List[Teacher]] = None
+    classes: Optional[List[Class]] = None
+
+# Import Models
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
+# Bulk Models
+class BulkItemResult(BaseModel):
+    id: str
+    status: Literal["updated", "deleted", "not_found"]
+
+class BulkResult(BaseModel):
+    count: int
+    results: List[BulkItemResult]
+
+# Job Models
+class JobCreate(BaseModel):
+    kind: Literal["report_cards", "attendance_summary"]
+    params: dict = {}
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    params: dict
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    progress: float
+    format: str
+    createdAt: str
+    finishedAt: Optional[str] = None
+    error: Optional[str] = None
+
+# Analytics Models
+RollupDimension = Literal["grade", "status", "cohort_year", "cohort_month", "cohort_week"]
+
+class RollupRow(BaseModel):
+    dimension: str
+    key: str
+    grade: Optional[str] = None
+    students: int
+    averageGrade: Optional[float] = None
+    averageAttendance: Optional[float] = None
+
+class RollupRebuildResult(BaseModel):
+    verified: bool
+    mismatches: List[str]
+
 # Config for all models
 class Config:
     populate_by_name = True
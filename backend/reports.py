@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+# CPU-heavy report builders run by the job subsystem in worker processes.
+# They only take plain data (dicts) so they can be pickled to another process,
+# and call progress(fraction) between chunks, which raises if the job was cancelled.
+
+CHUNK_SIZE = 200
+
+def _letter_grade(score: int) -> str:
+    if score >= 90:
+        return "A"
+    if score >= 80:
+        return "B"
+    if score >= 70:
+        return "C"
+    if score >= 60:
+        return "D"
+    return "F"
+
+def report_cards(students: List[Dict[str, Any]], params: Dict[str, Any],
+                 progress: Callable[[float], None]) -> str:
+    # Rank students within their grade level by average grade
+    by_grade: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for student in students:
+        by_grade[student["grade"]].append(student)
+    ranks: Dict[str, int] = {}
+    for grade_students in by_grade.values():
+        grade_students.sort(key=lambda s: s.get("averageGrade") or 0, reverse=True)
+        for rank, student in enumerate(grade_students, start=1):
+            ranks[student["id"]] = rank
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "name", "grade", "averageGrade", "letter", "attendance", "rank", "classSize"])
+    for i, student in enumerate(students):
+        if i % CHUNK_SIZE == 0:
+            progress(i / max(len(students), 1))
+        average = student.get("averageGrade")
+        writer.writerow([
+            student["id"],
+            student["name"],
+            student["grade"],
+            average if average is not None else "",
+            _letter_grade(average) if average is not None else "",
+            student.get("attendance") if student.get("attendance") is not None else "",
+            ranks[student["id"]],
+            len(by_grade[student["grade"]]),
+        ])
+    return out.getvalue()
+
+def attendance_summary(students: List[Dict[str, Any]], params: Dict[str, Any],
+                       progress: Callable[[float], None]) -> str:
+    threshold = int(params.get("threshold", 85))
+    levels: Dict[str, Dict[str, Any]] = {}
+    for i, student in enumerate(students):
+        if i % CHUNK_SIZE == 0:
+            progress(i / max(len(students), 1))
+        attendance = student.get("attendance")
+        if attendance is None:
+            continue
+        level = levels.setdefault(student["grade"], {
+            "grade": student["grade"], "students": 0, "total": 0,
+            "min": attendance, "max": attendance, "atRisk": [],
+        })
+        level["students"] += 1
+        level["total"] += attendance
+        level["min"] = min(level["min"], attendance)
+        level["max"] = max(level["max"], attendance)
+        if attendance < threshold:
+            level["atRisk"].append({"id": student["id"], "name": student["name"], "attendance": attendance})
+
+    summary = []
+    for level in sorted(levels.values(), key=lambda l: l["grade"]):
+        total = level.pop("total")
+        level["averageAttendance"] = round(total / level["students"], 1)
+        summary.append(level)
+    return json.dumps({"threshold": threshold, "gradeLevels": summary})
+
+JOB_KINDS = {
+    "report_cards": (report_cards, "csv"),
+    "attendance_summary": (attendance_summary, "json"),
+}
@@ -0,0 +1,117 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Materialized student rollups, maintained incrementally from the change feed.
+#
+# Every student contributes to one group per dimension, both school-wide and
+# within their grade level. Groups keep sums and counts, so an insert, update
+# or delete only touches the groups of that one student and queries read the
+# precomputed totals instead of scanning records.
+
+DIMENSIONS = ("grade", "status", "cohort_year", "cohort_month", "cohort_week")
+
+Key = Tuple[Optional[str], str, str]
+
+def _cohort(enrollment_date: str) -> Dict[str, str]:
+    try:
+        enrolled = date.fromisoformat(enrollment_date[:10])
+    except ValueError:
+        year = enrollment_date[:4] if enrollment_date[:4].isdigit() else "unknown"
+        return {"cohort_year": year, "cohort_month": "unknown", "cohort_week": "unknown"}
+    iso_year, iso_week, _ = enrolled.isocalendar()
+    return {
+        "cohort_year": f"{enrolled.year}",
+        "cohort_month": f"{enrolled.year}-{enrolled.month:02d}",
+        "cohort_week": f"{iso_year}-W{iso_week:02d}",
+    }
+
+def _contribution(student: Dict[str, Any]) -> Tuple[List[Key], Optional[int], Optional[int]]:
+    values = {"grade": student["grade"], "status": student["status"], **_cohort(student["enrollmentDate"])}
+    keys: List[Key] = []
+    for dimension in DIMENSIONS:
+        keys.append((None, dimension, values[dimension]))
+        keys.append((student["grade"], dimension, values[dimension]))
+    return keys, student.get("averageGrade"), student.get("attendance")
+
+class Rollups:
+    def __init__(self):
+        self.groups: Dict[Key, Dict[str, int]] = {}
+        # What each student currently contributes, so it can be subtracted later
+        self._contributions: Dict[str, Tuple[List[Key], Optional[int], Optional[int]]] = {}
+
+    def _add(self, contribution, sign: int) -> None:
+        keys, average_grade, attendance = contribution
+        for key in keys:
+            group = self.groups.setdefault(key, {
+                "students": 0, "gradeSum": 0, "gradeCount": 0,
+                "attendanceSum": 0, "attendanceCount": 0,
+            })
+            group["students"] += sign
+            if average_grade is not None:
+                group["gradeSum"] += sign * average_grade
+                group["gradeCount"] += sign
+            if attendance is not None:
+                group["attendanceSum"] += sign * attendance
+                group["attendanceCount"] += sign
+            if group["students"] == 0:
+                del self.groups[key]
+
+    def remove(self, student_id: str) -> None:
+        contribution = self._contributions.pop(student_id, None)
+        if contribution is not None:
+            self._add(contribution, -1)
+
+    def upsert(self, student: Dict[str, Any]) -> None:
+        self.remove(student["id"])
+        contribution = _contribution(student)
+        self._contributions[student["id"]] = contribution
+        self._add(contribution, 1)
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        if change["collection"] != "students":
+            return
+        if change["op"] == "delete":
+            self.remove(change["id"])
+        else:
+            self.upsert(change["data"])
+
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> None:
+        # Group totals are plain sums, so a batch is just each change in turn
+        for change in changes:
+            self.apply_change(change)
+
+    @classmethod
+    def build(cls, students: Iterable[Dict[str, Any]]) -> "Rollups":
+        rollups = cls()
+        for student in students:
+            rollups.upsert(student)
+        return rollups
+
+    def query(self, dimension: str, grade: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = []
+        for (grade_level, group_dimension, key), group in self.groups.items():
+            if group_dimension != dimension or grade_level != grade:
+                continue
+            rows.append({
+                "dimension": dimension,
+                "key": key,
+                "grade": grade,
+                "students": group["students"],
+                "averageGrade": (
+                    round(group["gradeSum"] / group["gradeCount"], 1) if group["gradeCount"] else None
+                ),
+                "averageAttendance": (
+                    round(group["attendanceSum"] / group["attendanceCount"], 1)
+                    if group["attendanceCount"] else None
+                ),
+            })
+        rows.sort(key=lambda row: row["key"])
+        return rows
+
+    def diff(self, other: "Rollups") -> List[str]:
+        # Keys whose totals differ between two rollups
+        keys = set(self.groups) | set(other.groups)
+        return sorted(
+            ":".join(part or "*" for part in key)
+            for key in keys if self.groups.get(key) != other.groups.get(key)
+        )
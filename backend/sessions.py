@@ -0,0 +1,178 @@
+import hashlib
+import heapq
+import secrets
+import time
+from typing import Any, Dict, List, Optional
+
+import database
+from ids import new_id
+
+# Refresh-token sessions and access-token revocation.
+#
+# Refresh tokens are opaque and rotated on every use: the presented token is
+# retired and a new one from the same family is issued. Presenting a retired
+# token again means it leaked, so the whole family is revoked. Revoked access
+# tokens are remembered by jti only until they would have expired anyway.
+#
+# Everything is held in ExpiringDicts, which group keys into time buckets by
+# expiry: lookups are a single dict access and expired entries are dropped a
+# whole bucket at a time, so memory stays proportional to live tokens.
+#
+# Changes go through the change feed as "sessions" entries so every worker
+# process sees the same sessions and revocations.
+
+REFRESH_TOKEN_EXPIRE_DAYS = 7
+BUCKET_SECONDS = 60
+
+class ExpiringDict:
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.clear()
+
+    def clear(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._buckets: Dict[int, set] = {}
+        # Min-heap of bucket numbers, so the expired ones are found in O(log n)
+        self._bucket_heap: List[int] = []
+
+    def _purge(self, now: float) -> None:
+        current = int(now // self.bucket_seconds)
+        while self._bucket_heap and self._bucket_heap[0] < current:
+            for key in self._buckets.pop(heapq.heappop(self._bucket_heap), ()):
+                self._values.pop(key, None)
+                self._expires.pop(key, None)
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        now = time.time()
+        self._purge(now)
+        if expires_at <= now:
+            return
+        self.pop(key)
+        bucket = int(expires_at // self.bucket_seconds)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = set()
+            heapq.heappush(self._bucket_heap, bucket)
+        self._buckets[bucket].add(key)
+        self._values[key] = value
+        self._expires[key] = expires_at
+
+    def get(self, key: str) -> Any:
+        expires_at = self._expires.get(key)
+        if expires_at is None or expires_at <= time.time():
+            return None
+        return self._values[key]
+
+    def expires_at(self, key: str) -> Optional[float]:
+        return self._expires.get(key)
+
+    def pop(self, key: str) -> Any:
+        expires_at = self._expires.pop(key, None)
+        if expires_at is None:
+            return None
+        self._buckets.get(int(expires_at // self.bucket_seconds), set()).discard(key)
+        return self._values.pop(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def dump(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            key: [self._values[key], expires_at]
+            for key, expires_at in self._expires.items() if expires_at > now
+        }
+
+    def load(self, data: Dict[str, Any]) -> None:
+        for key, (value, expires_at) in data.items():
+            self.set(key, value, expires_at)
+
+# jti of revoked access tokens
+REVOKED_TOKENS = ExpiringDict()
+# Active refresh tokens by hash -> {"email", "tenant", "family"}
+REFRESH_SESSIONS = ExpiringDict()
+# Retired refresh tokens by hash -> family, to detect reuse
+RETIRED_TOKENS = ExpiringDict()
+# Revoked refresh token families
+REVOKED_FAMILIES = ExpiringDict()
+
+_STORES = {
+    "revoked_tokens": REVOKED_TOKENS,
+    "refresh_sessions": REFRESH_SESSIONS,
+    "retired_tokens": RETIRED_TOKENS,
+    "revoked_families": REVOKED_FAMILIES,
+}
+
+def _apply(change: Dict[str, Any]) -> None:
+    store = _STORES[change["store"]]
+    if change["op"] == "delete":
+        store.pop(change["id"])
+    else:
+        store.set(change["id"], change["data"], change["expires"])
+
+def _change(store: str, op: str, key: str, data: Any = None, expires: Optional[float] = None) -> None:
+    change = {"collection": "sessions", "store": store, "op": op, "id": key, "data": data, "expires": expires}
+    _apply(change)
+    for listener in database.CHANGE_LISTENERS:
+        listener(change)
+
+def _dump() -> Dict[str, Any]:
+    return {name: store.dump() for name, store in _STORES.items()}
+
+def _load(state: Optional[Dict[str, Any]]) -> None:
+    for name, store in _STORES.items():
+        store.clear()
+        if state:
+            store.load(state.get(name, {}))
+
+database.STATE_EXTENSIONS["sessions"] = (_apply, _dump, _load)
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def create_refresh_token(email: str, tenant: str, family: Optional[str] = None) -> str:
+    token = secrets.token_urlsafe(32)
+    expires = time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    session = {"email": email, "tenant": tenant, "family": family or new_id()}
+    _change("refresh_sessions", "set", _hash(token), session, expires)
+    return token
+
+def rotate_refresh_token(token: str) -> Optional[Dict[str, Any]]:
+    # Returns the session with a new "refresh_token", or None if the token is not valid
+    token_hash = _hash(token)
+    session = REFRESH_SESSIONS.get(token_hash)
+    if session is None:
+        family = RETIRED_TOKENS.get(token_hash)
+        if family is not None:
+            # A retired token was replayed: revoke everything issued from it
+            revoke_family(family)
+        return None
+    if session["family"] in REVOKED_FAMILIES:
+        return None
+
+    expires = REFRESH_SESSIONS.expires_at(token_hash)
+    _change("refresh_sessions", "delete", token_hash)
+    _change("retired_tokens", "set", token_hash, session["family"], expires)
+    return {
+        **session,
+        "refresh_token": create_refresh_token(session["email"], session["tenant"], session["family"]),
+    }
+
+def revoke_family(family: str) -> None:
+    expires = time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    _change("revoked_families", "set", family, True, expires)
+
+def revoke_refresh_token(token: str) -> None:
+    session = REFRESH_SESSIONS.get(_hash(token))
+    if session is not None:
+        revoke_family(session["family"])
+        _change("refresh_sessions", "delete", _hash(token))
+
+def revoke_access_token(jti: str, expires: float) -> None:
+    _change("revoked_tokens", "set", jti, True, expires)
+
+def is_access_token_revoked(jti: Optional[str]) -> bool:
+    return jti is not None and jti in REVOKED_TOKENS
@@ -0,0 +1,203 @@
+import fcntl
+import json
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import database
+
+# Shared state for running several uvicorn workers over one dataset.
+#
+# The authoritative data lives in a state directory:
+#   HEAD                 current generation number
+#   snapshot-<gen>.json  full dataset at the start of a generation
+#   journal-<gen>.ndjson every change made since that snapshot
+#
+# Writes are serialized across processes by an exclusive lock on LOCK, held
+# only for the duration of a write (see writing()), so there is a single
+# writer at any time. A write's changes are appended and fsynced together when
+# it finishes. Every worker keeps its own in-memory copy and, before serving a
+# request, replays only the journal tail it has not seen yet (read through
+# mmap). Once the journal gets long the writer folds it into a new snapshot
+# and starts the next generation.
+
+SNAPSHOT_EVERY = 5000
+
+_state_dir: Optional[str] = None
+_generation = -1
+_offset = 0
+_journal_entries = 0
+_writing = False
+# Journal lines of the write in progress
+_pending: List[bytes] = []
+# Held while the journal offset moves, by replay and by publishing alike
+_journal_lock = threading.Lock()
+_lock_file = None
+
+def is_enabled() -> bool:
+    return _state_dir is not None
+
+def _path(name: str) -> str:
+    return os.path.join(_state_dir, name)
+
+def _read_generation() -> int:
+    try:
+        with open(_path("HEAD")) as head:
+            return int(head.read().strip() or -1)
+    except FileNotFoundError:
+        return -1
+
+def _write_snapshot(generation: int) -> None:
+    snapshot = _path(f"snapshot-{generation}.json")
+    with open(snapshot + ".tmp", "w") as out:
+        json.dump(database.dump_state(), out)
+    os.replace(snapshot + ".tmp", snapshot)
+    open(_path(f"journal-{generation}.ndjson"), "ab").close()
+
+    with open(_path("HEAD.tmp"), "w") as head:
+        head.write(str(generation))
+    os.replace(_path("HEAD.tmp"), _path("HEAD"))
+
+    # Keep the previous generation around for workers still reading it
+    for name in (f"snapshot-{generation - 2}.json", f"journal-{generation - 2}.ndjson"):
+        try:
+            os.remove(_path(name))
+        except FileNotFoundError:
+            pass
+
+def _load_snapshot(generation: int) -> None:
+    global _generation, _offset, _journal_entries
+    with open(_path(f"snapshot-{generation}.json")) as snapshot:
+        database.load_state(json.load(snapshot))
+    _generation = generation
+    _offset = 0
+    _journal_entries = 0
+
+def _journal_size() -> int:
+    try:
+        return os.path.getsize(_path(f"journal-{_generation}.ndjson"))
+    except FileNotFoundError:
+        return -1
+
+def sync() -> None:
+    # Brings this process up to date with changes written by other workers.
+    # Blocking file I/O: call it from a worker thread, not the event loop.
+    if _read_generation() == _generation and 0 <= _journal_size() <= _offset:
+        return
+    # Replay mutates the data, so it excludes readers and this worker's writer
+    with database.DATA_LOCK.write(), _journal_lock:
+        _sync()
+
+def _sync() -> None:
+    global _generation, _offset, _journal_entries
+    while True:
+        generation = _read_generation()
+        try:
+            journal = open(_path(f"journal-{_generation}.ndjson"), "rb")
+        except FileNotFoundError:
+            # Too far behind (or just starting): our journal is gone, so start
+            # over from the current snapshot
+            _load_snapshot(generation)
+            continue
+        with journal:
+            _replay(journal)
+        if generation == _generation:
+            return
+        # Our generation is over, so its journal was complete, and replaying it
+        # to the end leaves exactly the next generation's snapshot. Moving on
+        # keeps the data and change logs instead of reloading everything.
+        _generation += 1
+        _offset = 0
+        _journal_entries = 0
+
+def _replay(journal) -> None:
+    global _offset, _journal_entries
+    size = os.fstat(journal.fileno()).st_size
+    if size <= _offset:
+        return
+    with mmap.mmap(journal.fileno(), size, access=mmap.ACCESS_READ) as data:
+        # Only apply complete lines; a writer may be mid-append
+        end = data.rfind(b"\n", _offset, size) + 1
+        if end <= _offset:
+            return
+        for line in data[_offset:end].splitlines():
+            database.apply_change(json.loads(line))
+            _journal_entries += 1
+        _offset = end
+
+def _publish(change: Dict[str, Any]) -> None:
+    if not _writing:
+        raise RuntimeError("Shared state changes must be made inside shared_state.writing()")
+    _pending.append((json.dumps(change) + "\n").encode())
+
+def _flush() -> None:
+    global _offset, _journal_entries
+    if not _pending:
+        return
+    data = b"".join(_pending)
+    with _journal_lock:
+        with open(_path(f"journal-{_generation}.ndjson"), "ab") as journal:
+            journal.write(data)
+            journal.flush()
+            os.fsync(journal.fileno())
+        _offset += len(data)
+        _journal_entries += len(_pending)
+    _pending.clear()
+
+def _acquire() -> None:
+    fcntl.flock(_lock_file, fcntl.LOCK_EX)
+
+def _release() -> None:
+    fcntl.flock(_lock_file, fcntl.LOCK_UN)
+
+@contextmanager
+def writing() -> Iterator[None]:
+    # Wraps one write. Runs on a worker thread that already holds
+    # database.DATA_LOCK for writing, which makes it the only writer in this
+    # process; the flock makes it the only one across processes.
+    global _writing, _generation, _offset, _journal_entries
+    if not is_enabled():
+        yield
+        return
+    _acquire()
+    try:
+        with _journal_lock:
+            _sync()
+        _writing = True
+        try:
+            yield
+        finally:
+            _writing = False
+            # Changes already applied locally are published even if the write failed
+            _flush()
+        if _journal_entries >= SNAPSHOT_EVERY:
+            with _journal_lock:
+                # The snapshot is this worker's own data, so there is nothing to reload
+                _write_snapshot(_generation + 1)
+                _generation += 1
+                _offset = 0
+                _journal_entries = 0
+    finally:
+        _release()
+
+def enable(state_dir: str) -> None:
+    global _state_dir, _lock_file
+    if _state_dir is not None:
+        return
+    os.makedirs(state_dir, exist_ok=True)
+    _state_dir = state_dir
+    _lock_file = open(_path("LOCK"), "a")
+    # The shared snapshot must keep every tenant a worker has touched
+    database.ALLOW_TENANT_UNLOAD = False
+
+    _acquire()
+    try:
+        # The first worker to start seeds the shared state with its data
+        if _read_generation() < 0:
+            _write_snapshot(0)
+        sync()
+    finally:
+        _release()
+    database.CHANGE_LISTENERS.append(_publish)
@@ -0,0 +1,256 @@
+import os
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import anyio
+
+import database
+import importer
+import sessions
+import shared_state
+from auth import revoke_token
+from models import StudentCreate, TeacherCreate
+
+# Async repository API over the data layer, for use from the async route
+# handlers:
+#
+#     store: Store = Depends(get_store)
+#     student = await store.students.get(student_id)
+#     async for student in store.students.scan(query): ...
+#
+# Every call runs the synchronous database function on a worker thread, so a
+# slow query only delays its own request instead of blocking the event loop.
+# Each request checks out a connection from a fixed-size pool for its whole
+# duration, which bounds how many requests touch the data layer at once; the
+# rest wait without blocking. Reads share database.DATA_LOCK and writes take
+# it exclusively, so a reader never sees a structure mid-update.
+
+POOL_SIZE = int(os.environ.get("FOCUS_DB_POOL_SIZE", "10"))
+SCAN_CHUNK_SIZE = 500
+
+class ConnectionPool:
+    def __init__(self, size: int):
+        self.size = size
+        self._slots = anyio.Semaphore(size)
+        self._threads = anyio.CapacityLimiter(size)
+        self._write_lock = anyio.Lock()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["Connection"]:
+        async with self._slots:
+            yield Connection(self)
+
+class Connection:
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    async def _offload(self, func: Callable) -> Any:
+        # The thread inherits this request's context, including its tenant
+        return await anyio.to_thread.run_sync(func, limiter=self._pool._threads)
+
+    async def compute(self, func: Callable, *args: Any) -> Any:
+        # Blocking work that doesn't touch the shared data, so it takes no lock
+        return await self._offload(lambda: func(*args))
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        def read():
+            with database.DATA_LOCK.read():
+                return func(*args)
+        return await self._offload(read)
+
+    async def write(self, func: Callable, *args: Any) -> Any:
+        def write():
+            with database.DATA_LOCK.write(), shared_state.writing():
+                return func(*args)
+        # Queue writers here rather than each parking a thread on DATA_LOCK
+        async with self._pool._write_lock:
+            return await self._offload(write)
+
+    async def scan(self, iterator: Callable, *args: Any) -> AsyncIterator[Any]:
+        # Pulls records in chunks so a long scan yields to other requests between
+        # them. Streamed exports keep scanning after the request's checkout is
+        # released; their chunks still count against the thread limit.
+        records = await self.run(iterator, *args)
+        while True:
+            chunk = await self.run(lambda: list(islice(records, SCAN_CHUNK_SIZE)))
+            if not chunk:
+                return
+            for record in chunk:
+                yield record
+
+async def _import_rows(connection: Connection, rows: Iterator[Tuple[int, Any]],
+                       model: Any, insert_batch: Callable) -> Dict[str, Any]:
+    # Reading the upload and validating rows run off the loop without a lock;
+    # the write lock is only held while each validated batch is inserted
+    batches = importer.iter_batches(rows, model)
+    imported = 0
+    failed_rows: List[Dict[str, Any]] = []
+    while True:
+        batch = await connection.compute(next, batches, None)
+        if batch is None:
+            break
+        valid, errors = batch
+        if valid:
+            imported += len(await connection.write(insert_batch, valid))
+        failed_rows.extend(errors)
+    return {"imported": imported, "failed": len(failed_rows), "errors": failed_rows}
+
+def _projected(func: Callable, fields: Optional[List[str]]) -> Callable:
+    # Projection runs in the same locked call that reads the records, so only
+    # the requested fields are copied out
+    if not fields:
+        return func
+    return lambda *args: database.project(func(*args), fields)
+
+def _projected_one(func: Callable, fields: Optional[List[str]]) -> Callable:
+    if not fields:
+        return func
+    def get(*args):
+        record = func(*args)
+        return None if record is None else database.project([record], fields)[0]
+    return get
+
+class Repository:
+    _get: Callable
+    _list: Callable
+    _iter: Callable
+    _add: Callable
+    _update: Callable
+    _delete: Callable
+
+    def __init__(self, connection: Connection):
+        self._connection = connection
+
+    async def get(self, record_id: str, fields: Optional[List[str]] = None) -> Optional[Any]:
+        return await self._connection.run(_projected_one(self._get, fields), record_id)
+
+    async def list(self, query: Optional[str] = None, fields: Optional[List[str]] = None) -> List[Any]:
+        return await self._connection.run(_projected(self._list, fields), query)
+
+    def scan(self, query: Optional[str] = None) -> AsyncIterator[Any]:
+        return self._connection.scan(self._iter, query)
+
+    async def add(self, data: Any) -> Any:
+        return await self._connection.write(self._add, data)
+
+    async def update(self, record_id: str, data: Any) -> Optional[Any]:
+        return await self._connection.write(self._update, record_id, data)
+
+    async def delete(self, record_id: str) -> bool:
+        return await self._connection.write(self._delete, record_id)
+
+class StudentRepository(Repository):
+    _get = staticmethod(database.get_student_by_id)
+    _list = staticmethod(database.get_students)
+    _iter = staticmethod(database.iter_students)
+    _add = staticmethod(database.add_student)
+    _update = staticmethod(database.update_student)
+    _delete = staticmethod(database.delete_student)
+
+    async def search(self, conditions: List[tuple], order_by: Optional[str] = None,
+                     descending: bool = False, limit: Optional[int] = None,
+                     fields: Optional[List[str]] = None) -> List[Any]:
+        return await self._connection.run(
+            database.search_students, conditions, order_by, descending, limit, fields
+        )
+
+    async def update_bulk(self, selector: Any, changes: Any) -> List[Dict[str, str]]:
+        return await self._connection.write(database.update_students_bulk, selector, changes)
+
+    async def delete_bulk(self, selector: Any) -> List[Dict[str, str]]:
+        return await self._connection.write(database.delete_students_bulk, selector)
+
+    async def import_rows(self, rows: Iterator[Tuple[int, Any]]) -> Dict[str, Any]:
+        return await _import_rows(self._connection, rows, StudentCreate, database.add_students_bulk)
+
+class TeacherRepository(Repository):
+    _get = staticmethod(database.get_teacher_by_id)
+    _list = staticmethod(database.get_teachers)
+    _iter = staticmethod(database.iter_teachers)
+    _add = staticmethod(database.add_teacher)
+    _update = staticmethod(database.update_teacher)
+    _delete = staticmethod(database.delete_teacher)
+
+    async def import_rows(self, rows: Iterator[Tuple[int, Any]]) -> Dict[str, Any]:
+        return await _import_rows(self._connection, rows, TeacherCreate, database.add_teachers_bulk)
+
+class ClassRepository(Repository):
+    _get = staticmethod(database.get_class_by_id)
+    _list = staticmethod(database.get_classes)
+    _iter = staticmethod(database.iter_classes)
+    _add = staticmethod(database.add_class)
+    _update = staticmethod(database.update_class)
+    _delete = staticmethod(database.delete_class)
+
+class ActivityRepository:
+    def __init__(self, connection: Connection):
+        self._connection = connection
+
+    async def list(self, limit: int = 5, fields: Optional[List[str]] = None) -> List[Any]:
+        return await self._connection.run(_projected(database.get_activities, fields), limit)
+
+    def scan(self) -> AsyncIterator[Any]:
+        return self._connection.scan(database.iter_activities)
+
+class UserRepository:
+    def __init__(self, connection: Connection):
+        self._connection = connection
+
+    async def authenticate(self, email: str, password: str) -> Optional[Any]:
+        # bcrypt verification is deliberately slow, so it must not run on the loop
+        return await self._connection.run(database.authenticate_user, email, password)
+
+class SessionRepository:
+    # Session changes go through the change feed like any other write
+    def __init__(self, connection: Connection):
+        self._connection = connection
+
+    async def create_refresh_token(self, email: str, tenant: str) -> str:
+        return await self._connection.write(sessions.create_refresh_token, email, tenant)
+
+    async def rotate_refresh_token(self, token: str) -> Optional[Dict[str, Any]]:
+        return await self._connection.write(sessions.rotate_refresh_token, token)
+
+    async def revoke(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        def revoke():
+            revoke_token(access_token)
+            if refresh_token:
+                sessions.revoke_refresh_token(refresh_token)
+        await self._connection.write(revoke)
+
+class Store:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.students = StudentRepository(connection)
+        self.teachers = TeacherRepository(connection)
+        self.classes = ClassRepository(connection)
+        self.activities = ActivityRepository(connection)
+        self.users = UserRepository(connection)
+        self.sessions = SessionRepository(connection)
+
+    async def dashboard_stats(self, role: str) -> Any:
+        return await self.connection.run(database.get_dashboard_stats, role)
+
+    async def rollups(self, dimension: str, grade: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.connection.run(database.query_rollups, dimension, grade)
+
+    async def rebuild_rollups(self) -> List[str]:
+        return await self.connection.write(database.rebuild_rollups)
+
+    async def changes_since(self, since: Optional[int] = None) -> Dict[str, Any]:
+        return await self.connection.run(database.get_changes_since, since)
+
+_pool: Optional[ConnectionPool] = None
+
+def get_pool() -> ConnectionPool:
+    # Created on first use so the anyio primitives belong to the running loop
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(POOL_SIZE)
+    return _pool
+
+async def get_store() -> AsyncIterator[Store]:
+    # FastAPI dependency: one pooled connection for the duration of the request
+    async with get_pool().connection() as connection:
+        yield Store(connection)
@@ -0,0 +1,80 @@
+import operator
+import random
+
+import pytest
+
+from indexes import StudentIndexes, parse_filter
+
+# Checks StudentIndexes.search against a plain scan over 100k random records
+
+_OPERATORS = {"=": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+WHERE = [
+    "",
+    "attendance<60",
+    "attendance>=55,averageGrade<50",
+    "grade=10th,attendance>90,averageGrade>=95",
+    "attendance=77",
+    "status=active",
+    "enrollmentDate>2023-05-01,attendance<52",
+]
+
+@pytest.fixture(scope="module")
+def records():
+    rng = random.Random(1)
+    return [
+        {
+            "id": f"{i:06d}",
+            "grade": rng.choice(["9th", "10th", "11th"]),
+            "status": rng.choice(["active", "inactive"]),
+            "attendance": rng.randint(50, 100),
+            "averageGrade": rng.choice([None, rng.randint(40, 100)]),
+            "enrollmentDate": f"202{rng.randint(0, 4)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "dateOfBirth": "2008-01-01",
+        }
+        for i in range(100000)
+    ]
+
+@pytest.fixture(scope="module")
+def indexes(records):
+    return StudentIndexes.build(records)
+
+def _scan(records, conditions, order_by=None, descending=False):
+    results = [
+        record for record in records
+        if all(record.get(field) is not None and _OPERATORS[op](record[field], value) for field, op, value in conditions)
+    ]
+    if order_by is not None:
+        results = [record for record in results if record.get(order_by) is not None]
+        results.sort(key=lambda record: (record[order_by], record["id"]), reverse=descending)
+    return results
+
+@pytest.mark.parametrize("where", WHERE)
+@pytest.mark.parametrize("order_by", ["averageGrade", "attendance"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [None, 1, 5])
+def test_ordered_search_matches_scan(records, indexes, where, order_by, descending, limit):
+    conditions = parse_filter(where) if where else []
+    expected = _scan(records, conditions, order_by, descending)
+    if limit is not None:
+        expected = expected[:limit]
+    found = indexes.search(conditions, order_by, descending, limit)
+    assert [record["id"] for record in found] == [record["id"] for record in expected]
+
+@pytest.mark.parametrize("where", WHERE)
+@pytest.mark.parametrize("limit", [None, 1, 5])
+def test_unordered_search_matches_scan(records, indexes, where, limit):
+    conditions = parse_filter(where) if where else []
+    expected = {record["id"] for record in _scan(records, conditions)}
+    found = [record["id"] for record in indexes.search(conditions, limit=limit)]
+    assert len(found) == len(set(found))
+    if limit is None:
+        assert set(found) == expected
+    else:
+        assert len(found) == min(limit, len(expected))
+        assert set(found) <= expected
+
+def test_zero_limit_returns_nothing(indexes):
+    assert indexes.search([], limit=0) == []
+    assert indexes.search([], "attendance", limit=0) == []
+    assert indexes.search(parse_filter("attendance<60"), "attendance", limit=0) == []
@@ -15,6 +15,31 @@ interface AuthContextType {
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
+const AUTH_API_URL = 'http://192.168.1.38:9090/api/auth';
+
+// Refresh the access token this long before it expires
+const TOKEN_REFRESH_MARGIN_MS = 5 * 60 * 1000;
+
+// Expiry of a JWT in milliseconds, read from its payload
+const tokenExpiresAt = (token: string): number | null => {
+  try {
+    const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')));
+    return typeof payload.exp === 'number' ? payload.exp * 1000 : null;
+  } catch {
+    return null;
+  }
+};
+
+// Every tab shares one refresh token, and presenting one that was already
+// rotated revokes the whole session, so only one tab may refresh at a time
+const withRefreshLock = async (refresh: () => Promise<void>) => {
+  if ('locks' in navigator) {
+    await navigator.locks.request('focus_token_refresh', refresh);
+  } else {
+    await refresh();
+  }
+};
+
 export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children }) => {
   const [user, setUser] = useState<User | null>(null);
   const [accessToken, setAccessToken] = useState<string | null>(null);
@@ -42,12 +67,71 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
     setIsLoading(false);
   }, []);
 
+  useEffect(() => {
+    // Pick up tokens refreshed by another tab, and log out along with it
+    const handleStorage = (event: StorageEvent) => {
+      if (event.key !== 'focus_token') return;
+      if (event.newValue) {
+        setAccessToken(event.newValue);
+      } else {
+        setAccessToken(null);
+        setUser(null);
+      }
+    };
+    
+    window.addEventListener('storage', handleStorage);
+    return () => window.removeEventListener('storage', handleStorage);
+  }, []);
+
+  useEffect(() => {
+    if (!accessToken) return;
+    
+    const refreshTokens = () => withRefreshLock(async () => {
+      // Another tab may have refreshed while we waited for the lock
+      const storedToken = localStorage.getItem('focus_token');
+      if (storedToken && storedToken !== accessToken) {
+        setAccessToken(storedToken);
+        return;
+      }
+      
+      const refreshToken = localStorage.getItem('focus_refresh_token');
+      if (!refreshToken) return;
+      
+      try {
+        const response = await fetch(`${AUTH_API_URL}/refresh`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        
+        if (!response.ok) {
+          throw new Error('Token refresh failed');
+        }
+        
+        const data = await response.json();
+        setAccessToken(data.access_token);
+        localStorage.setItem('focus_token', data.access_token);
+        localStorage.setItem('focus_refresh_token', data.refresh_token);
+      } catch (error) {
+        console.error('Token refresh error:', error);
+      }
+    });
+    
+    // Schedule from the token's own expiry, so a reloaded page doesn't wait a full interval
+    const expiresAt = tokenExpiresAt(accessToken);
+    const delay = expiresAt === null ? 0 : Math.max(expiresAt - TOKEN_REFRESH_MARGIN_MS - Date.now(), 0);
+    const timeout = setTimeout(refreshTokens, delay);
+    return () => clearTimeout(timeout);
+  }, [accessToken]);
+
   const login = async (email: string, password: string) => {
     try {
       setIsLoading(true);
       
       // Use fetch directly to connect to your backend server
-      const response = await fetch('http://192.168.1.38:9090/api/auth/login', {
+      const response = await fetch(`${AUTH_API_URL}/login`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -71,6 +155,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       // Store in localStorage
       localStorage.setItem('focus_user', JSON.stringify(userData));
       localStorage.setItem('focus_token', token);
+      localStorage.setItem('focus_refresh_token', data.refresh_token);
       
       toast({
         title: "Login successful",
@@ -90,10 +175,24 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('focus_refresh_token');
+    if (accessToken) {
+      // Revoke the tokens server-side; the local session ends either way
+      fetch(`${AUTH_API_URL}/logout`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${accessToken}`
+        },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(error => console.error('Logout error:', error));
+    }
+    
     setUser(null);
     setAccessToken(null);
     localStorage.removeItem('focus_user');
     localStorage.removeItem('focus_token');
+    localStorage.removeItem('focus_refresh_token');
     toast({
       title: "Logged out",
       description: "You have been successfully logged out",
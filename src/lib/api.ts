@@ -327,6 +327,54 @@ class ApiClient {
     }
   }
   
+  // Batch: run several GET requests in a single round trip
+  async batch(token: string, paths: string[]): Promise<{ path: string; status: number; body: any }[]> {
+    const response = await fetch(`${API_BASE_URL}/batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${token}`
+      },
+      body: JSON.stringify({ requests: paths.map(path => ({ path })) }),
+    });
+    
+    if (!response.ok) {
+      throw new Error('Batch request failed');
+    }
+    
+    const data = await response.json();
+    return data.responses;
+  }
+  
+  async getDashboardData(
+    token: string | null,
+    role: UserRole,
+    limit: number = 5
+  ): Promise<{ stats: DashboardStats; activities: ActivityItem[] }> {
+    if (token) {
+      try {
+        const [stats, activity] = await this.batch(token, [
+          '/api/dashboard/stats',
+          `/api/dashboard/activity?limit=${limit}`,
+        ]);
+        
+        if (stats.status !== 200 || activity.status !== 200) {
+          throw new Error('Failed to fetch dashboard data');
+        }
+        
+        return { stats: stats.body, activities: activity.body };
+      } catch (error) {
+        console.error('Failed to fetch dashboard data:', error);
+        // Fallback to mock data
+        return { stats: DASHBOARD_STATS, activities: ACTIVITIES.slice(0, limit) };
+      }
+    }
+    
+    // Fallback for demo/development
+    await delay(600);
+    return { stats: DASHBOARD_STATS, activities: ACTIVITIES.slice(0, limit) };
+  }
+  
   // Dashboard
   async getDashboardStats(token: string | null, role: UserRole): Promise<DashboardStats> {
     if (token) {
@@ -26,12 +26,10 @@ const Dashboard = () => {
       try {
         setIsLoading(true);
         if (user) {
-          // Pass both accessToken and user.role to getDashboardStats
-          const dashboardStats = await api.getDashboardStats(accessToken, user.role);
+          // Stats and recent activity are fetched together in one batch request
+          const { stats: dashboardStats, activities: recentActivity } =
+            await api.getDashboardData(accessToken, user.role, 5);
           setStats(dashboardStats);
-          
-          // Pass accessToken and limit (as number) to getRecentActivity
-          const recentActivity = await api.getRecentActivity(accessToken, 5);
           setActivities(recentActivity);
         }
       } catch (error) {